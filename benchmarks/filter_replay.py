@@ -0,0 +1,147 @@
+"""Replay a recorded message corpus through the filter decision logic.
+
+Usage: python -m benchmarks.filter_replay CORPUS CONFIG [--repeat N] [--show N]
+
+CORPUS is JSONL with one message per line. Only ``content`` is required;
+``author_id``, ``channel_id``, ``category_id``, ``role_ids`` and ``timestamp``
+(seconds, drives flood detection) are used when present. A plain JSON string
+per line is accepted as content.
+
+CONFIG is a guild filter in the stored form (``GuildFilter.to_dict``), e.g.
+``{"filtered_words": {"spam": {"penalty": "timeout", "timeout": 5}}, "block_invites": true}``.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from cogs.filter_commands import FilterCommands
+from utils.filter_engine import WORD, GuildFilter
+from utils.storage import Storage
+
+
+class FakeAuthor:
+    __slots__ = ('id', 'bot', '_roles')
+
+    def __init__(self, user_id: int, role_ids: List[int]):
+        self.id = user_id
+        self.bot = False
+        self._roles = role_ids
+
+
+class FakeChannel:
+    __slots__ = ('id', 'category_id')
+
+    def __init__(self, channel_id: int, category_id: Optional[int]):
+        self.id = channel_id
+        self.category_id = category_id
+
+
+class FakeMessage:
+    """The attributes FilterCommands.evaluate reads, and nothing else"""
+
+    __slots__ = ('content', 'author', 'channel', 'guild', 'timestamp')
+
+    def __init__(self, content: str, author: FakeAuthor, channel: FakeChannel, guild, timestamp: Optional[float]):
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.timestamp = timestamp
+
+
+def load_corpus(path: str) -> List[FakeMessage]:
+    guild = SimpleNamespace(id=0)
+    messages = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {'content': record}
+            author = FakeAuthor(int(record.get('author_id', 0)), [int(r) for r in record.get('role_ids', ())])
+            channel = FakeChannel(int(record.get('channel_id', 0)), record.get('category_id'))
+            messages.append(FakeMessage(record['content'], author, channel, guild, record.get('timestamp')))
+    return messages
+
+
+def load_filter(path: str) -> GuildFilter:
+    with open(path, encoding='utf-8') as f:
+        return GuildFilter.from_dict(json.load(f))
+
+
+def make_cog() -> FilterCommands:
+    # The cog only needs bot.storage to register its cache; nothing is opened
+    return FilterCommands(SimpleNamespace(storage=Storage(':memory:')))
+
+
+def replay(messages: List[FakeMessage], guild_filter: GuildFilter, show: int = 0) -> Dict:
+    cog = make_cog()
+    kinds = Counter()
+    words = Counter()
+    latencies = []
+    shown = 0
+
+    clock = time.perf_counter
+    started = clock()
+    for message in messages:
+        before = clock()
+        verdict = cog.evaluate(message, guild_filter, message.timestamp)
+        latencies.append(clock() - before)
+
+        if verdict is None:
+            kinds['clean'] += 1
+            continue
+        kinds[verdict.kind] += 1
+        if verdict.kind == WORD:
+            words[verdict.detected_word] += 1
+        if shown < show:
+            shown += 1
+            print(f"  [{verdict.reason}] {message.content[:100]!r}")
+    elapsed = clock() - started
+
+    latencies.sort()
+    return {
+        'messages': len(messages),
+        'elapsed': elapsed,
+        'p50': latencies[len(latencies) // 2] if latencies else 0.0,
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+        'kinds': kinds,
+        'words': words,
+    }
+
+
+def report(result: Dict, top: int = 10):
+    count = result['messages']
+    elapsed = result['elapsed']
+    print(f"{count} messages in {elapsed * 1000:.1f} ms  ({count / elapsed if elapsed else 0:,.0f} msg/s)")
+    print(f"latency p50 {result['p50'] * 1e6:.1f} µs  p99 {result['p99'] * 1e6:.1f} µs")
+    for kind, hits in result['kinds'].most_common():
+        print(f"  {kind:<10} {hits:>8}  ({hits / count:.2%})")
+    if result['words']:
+        print("top words:")
+        for word, hits in result['words'].most_common(top):
+            print(f"  {word:<20} {hits:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus')
+    parser.add_argument('config')
+    parser.add_argument('--repeat', type=int, default=1, help="replay the corpus N times (fresh flood state each run)")
+    parser.add_argument('--show', type=int, default=0, help="print the first N matched messages")
+    args = parser.parse_args()
+
+    messages = load_corpus(args.corpus)
+    guild_filter = load_filter(args.config)
+    for run in range(args.repeat):
+        if args.repeat > 1:
+            print(f"run {run + 1}/{args.repeat}")
+        report(replay(messages, guild_filter, args.show if run == 0 else 0))
+
+
+if __name__ == "__main__":
+    main()
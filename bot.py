@@ -9,6 +9,9 @@ from typing import Optional, Dict, List
 from datetime import datetime
 from dotenv import load_dotenv
 
+from utils.mod_actions import ModActionButton
+from utils.storage import Storage
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -48,6 +51,9 @@ class Bot(commands.Bot):
             'cogs.welcome_commands'
         ]
 
+        # Shared persistent storage for cog state
+        self.storage = Storage(os.getenv('DATABASE_PATH', 'bot.db'))
+
         # Initialize performance monitoring
         self.start_time = datetime.utcnow()
         self.command_usage = {}
@@ -56,6 +62,12 @@ class Bot(commands.Bot):
     async def setup_hook(self):
         """Initialize bot settings and load extensions"""
         try:
+            # Open storage before cogs start reading their state
+            await self.storage.open()
+
+            # Register persistent moderation buttons once for every log message
+            self.add_dynamic_items(ModActionButton)
+
             # Load extensions
             for extension in self.initial_extensions:
                 try:
@@ -73,6 +85,18 @@ class Bot(commands.Bot):
             logger.error(f'❌ Error in setup: {e}')
             self.error_count += 1
 
+    async def close(self):
+        """Shut down, then flush pending state to storage"""
+        # super().close() unloads the cogs and stops the gateway; storage has to
+        # stay open until then so late events and cog_unload writes still land
+        try:
+            await super().close()
+        finally:
+            try:
+                await self.storage.close()
+            except Exception as e:
+                logger.error(f'❌ Error closing storage: {e}')
+
     async def on_ready(self):
         """Handle bot ready event"""
         try:
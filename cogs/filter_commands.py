@@ -1,58 +1,158 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from discord.ui import Button, View
-from typing import Dict, Optional, List
-import re
-
-class ModActionView(View):
-    def __init__(self, user_id: int):
-        super().__init__(timeout=None)
-        self.user_id = user_id
-
-    @discord.ui.button(label="Ban", style=discord.ButtonStyle.danger)
-    async def ban_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not interaction.user.guild_permissions.ban_members:
-            await interaction.response.send_message("BANの権限がありません。", ephemeral=True)
-            return
-        
-        try:
-            member = await interaction.guild.fetch_member(self.user_id)
-            await member.ban(reason="サーバー内での違反")
-            await interaction.response.send_message(f"{member.name}をBANしました。", ephemeral=True)
-        except:
-            await interaction.response.send_message("BANに失敗しました。", ephemeral=True)
-
-    @discord.ui.button(label="Kick", style=discord.ButtonStyle.danger)
-    async def kick_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not interaction.user.guild_permissions.kick_members:
-            await interaction.response.send_message("KICKの権限がありません。", ephemeral=True)
+from typing import Dict, NamedTuple, Optional, List, Set
+from datetime import timedelta
+import asyncio
+import logging
+import time
+
+from utils.filter_engine import CLEAN, INVITE, LITERAL, URL, WORD, GuildFilter, compile_rule
+from utils.flood import RATE, SHARED_DUPLICATE, FloodDetector
+from utils.log_sink import MAX_EMBEDS, embed_batches
+from utils.mod_actions import ModActionView
+from utils.mod_ledger import DEDUPE_WINDOW
+from utils.violations import ViolationStore
+
+logger = logging.getLogger('discord')
+
+FLOOD_PENALTY_COOLDOWN = 60  # seconds after a flood penalty before the same user can get another
+NEW_ACCOUNT_AGE = timedelta(days=7)  # accounts younger than this lose flooded text they posted once
+
+class Verdict(NamedTuple):
+    """What on_message decided to do about one message"""
+    kind: str  # WORD/URL/INVITE from the detector, or RATE/DUPLICATE/SHARED_DUPLICATE from flood detection
+    reason: str
+    settings: Dict
+    detected_word: Optional[str] = None
+    warning: Optional[str] = None
+
+class ViolationLogBatcher:
+    """Coalesces filter log entries per log channel.
+
+    Violations are collected for ``window`` seconds (or until ``MAX_EMBEDS``
+    distinct offenders are pending) and then sent as multi-embed messages.
+    Repeat offenders within a window are merged into a single entry.
+    """
+
+    def __init__(self, window: float = 3.0):
+        self.window = window
+        self._pending: Dict[int, Dict[int, Dict]] = {}  # channel_id -> user_id -> entry
+        self._channels: Dict[int, discord.TextChannel] = {}
+        self._timers: Dict[int, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()  # timers and flushes still running
+
+    def add(self, log_channel: discord.TextChannel, message: discord.Message, reason: str,
+            detected_word: Optional[str], recent_count: int):
+        entries = self._pending.setdefault(log_channel.id, {})
+        self._channels[log_channel.id] = log_channel
+
+        entry = entries.get(message.author.id)
+        if entry is None:
+            entry = entries[message.author.id] = {
+                'user_id': message.author.id,
+                'mention': message.author.mention,
+                'name': message.author.display_name,
+                'avatar': message.author.display_avatar.url,
+                'first_at': message.created_at,
+                'hits': 0,
+                'reasons': [],
+                'words': []
+            }
+        entry['hits'] += 1
+        entry['content'] = message.content
+        entry['recent_count'] = recent_count
+        if reason not in entry['reasons']:
+            entry['reasons'].append(reason)
+        if detected_word and detected_word not in entry['words']:
+            entry['words'].append(detected_word)
+
+        if len(entries) >= MAX_EMBEDS:
+            timer = self._timers.pop(log_channel.id, None)
+            if timer:
+                timer.cancel()
+            self._track(asyncio.create_task(self.flush(log_channel.id)))
+        elif log_channel.id not in self._timers:
+            self._timers[log_channel.id] = self._track(asyncio.create_task(self._flush_later(log_channel.id)))
+
+    def _track(self, task: asyncio.Task) -> asyncio.Task:
+        # Held until done so the task is not garbage-collected and flush_all can wait for it
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f'❌ Filter log flush failed: {task.exception()}')
+
+    async def _flush_later(self, channel_id: int):
+        await asyncio.sleep(self.window)
+        self._timers.pop(channel_id, None)
+        await self.flush(channel_id)
+
+    async def flush(self, channel_id: int):
+        entries = self._pending.pop(channel_id, None)
+        log_channel = self._channels.pop(channel_id, None)
+        if not entries or not log_channel:
             return
-        
-        try:
-            member = await interaction.guild.fetch_member(self.user_id)
-            await member.kick(reason="サバー内での違反")
-            await interaction.response.send_message(f"{member.name}をKICKしました。", ephemeral=True)
-        except:
-            await interaction.response.send_message("KICKに失敗しました。", ephemeral=True)
-
-    @discord.ui.button(label="警告DM", style=discord.ButtonStyle.primary)
-    async def warn_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+
+        embeds = [self._build_embed(entry) for entry in entries.values()]
+        user_ids = [entry['user_id'] for entry in entries.values()]
+        start = 0
+        for batch in embed_batches(embeds):
+            await self._send(log_channel, batch, user_ids[start:start + len(batch)])
+            start += len(batch)
+
+    async def flush_all(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for channel_id in list(self._pending):
+            await self.flush(channel_id)
+        # Flushes started by add() may still be sending
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _send(self, log_channel: discord.TextChannel, embeds: List[discord.Embed], user_ids: List[int]):
+        # Moderation buttons only make sense when the message covers one offender
         try:
-            member = await interaction.guild.fetch_member(self.user_id)
-            await member.send(f"{member.name}さん、サーバーのルールに違反する投稿が検出されました。\n今後このような投稿は控えてください。")
-            await interaction.response.send_message(f"{member.name}に警告DMを送信しました。", ephemeral=True)
-        except:
-            await interaction.response.send_message("DMの送信に失敗しました。", ephemeral=True)
+            if len(user_ids) == 1:
+                await log_channel.send(embeds=embeds, view=ModActionView(user_ids[0]))
+            else:
+                await log_channel.send(embeds=embeds)
+        except Exception as e:
+            logger.error(f'❌ Failed to send filter log to {log_channel.id}: {e}')
+
+    @staticmethod
+    def _build_embed(entry: Dict) -> discord.Embed:
+        title = "ルール違反" if entry['hits'] == 1 else f"ルール違反 ×{entry['hits']}"
+        embed = discord.Embed(
+            title=title,
+            description=f"違反者: {entry['mention']} (`{entry['user_id']}`)\n"
+                       f"理由: {', '.join(entry['reasons'])}\n"
+                       f"違反回数 (24時間): {entry['recent_count']}",
+            color=discord.Color.red(),
+            timestamp=entry['first_at']
+        )
+        embed.set_author(name=entry['name'], icon_url=entry['avatar'])
+        embed.add_field(name="メッセージ内容", value=entry['content'][:1024] or "(なし)", inline=False)
+        if entry['words']:
+            embed.add_field(name="検出された禁止単語", value=", ".join(entry['words'])[:1024], inline=False)
+        return embed
 
 class FilterCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.filtered_words: Dict[str, Dict] = {}
-        self.block_urls: bool = False
-        self.block_invites: bool = False
-        self.log_channel: Optional[discord.TextChannel] = None
-        self.violation_counts: Dict[int, int] = {}
+        self.guild_filters = bot.storage.cache('filter', GuildFilter, GuildFilter.from_dict, GuildFilter.to_dict)
+        self.violations = ViolationStore()
+        # One flood penalty per burst; the rest of the burst is only deleted
+        self.flood_penalties = ViolationStore(ttl=FLOOD_PENALTY_COOLDOWN)
+        self.log_batcher = ViolationLogBatcher()
+        self.flood = FloodDetector()
+
+    async def cog_unload(self):
+        await self.log_batcher.flush_all()
 
     @app_commands.command(name="filter", description="コンテンツフィルターを管理")
     @app_commands.describe(
@@ -62,7 +162,10 @@ class FilterCommands(commands.Cog):
         penalty="違反時のアクション (kick/ban/timeout)",
         timeout="タイムアウト時間（分）",
         value="設定値",
-        channel="ログチャンネル"
+        channel="ログチャンネル",
+        match_type="一致方法 (literal/wildcard/word/regex)",
+        role="除外するロール (exempt用)",
+        category="除外するカテゴリー (exempt用)"
     )
     async def filter(
         self,
@@ -73,12 +176,18 @@ class FilterCommands(commands.Cog):
         penalty: Optional[str] = None,
         timeout: Optional[int] = None,
         value: Optional[bool] = None,
-        channel: Optional[discord.TextChannel] = None
+        channel: Optional[discord.TextChannel] = None,
+        match_type: Optional[str] = None,
+        role: Optional[discord.Role] = None,
+        category: Optional[discord.CategoryChannel] = None
     ):
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("このコマンドは管理者のみ使用できます。", ephemeral=True)
             return
 
+        guild_filter = await self.guild_filters.load(interaction.guild.id)
+        filtered_words = guild_filter.filtered_words
+
         if action == "word":
             if subaction == "add":
                 if not all([word, penalty]):
@@ -89,10 +198,21 @@ class FilterCommands(commands.Cog):
                     await interaction.response.send_message("無効なペナルティです。", ephemeral=True)
                     return
 
-                self.filtered_words[word] = {
+                rule_type = match_type or LITERAL
+                if rule_type != LITERAL:
+                    try:
+                        compile_rule(rule_type, word)
+                    except ValueError as e:
+                        await interaction.response.send_message(f"パターンを登録できません: {e}", ephemeral=True)
+                        return
+
+                filtered_words[word] = {
                     'penalty': penalty,
-                    'timeout': timeout if penalty == "timeout" else None
+                    'timeout': timeout if penalty == "timeout" else None,
+                    'type': rule_type
                 }
+                guild_filter.rebuild_matcher()
+                self.guild_filters.mark_dirty(interaction.guild.id)
                 await interaction.response.send_message(f"フィルター単語を追加しました: {word}", ephemeral=True)
 
             elif subaction == "remove":
@@ -100,8 +220,10 @@ class FilterCommands(commands.Cog):
                     await interaction.response.send_message("単語を指定してください。", ephemeral=True)
                     return
                 
-                if word in self.filtered_words:
-                    del self.filtered_words[word]
+                if word in filtered_words:
+                    del filtered_words[word]
+                    guild_filter.rebuild_matcher()
+                    self.guild_filters.mark_dirty(interaction.guild.id)
                     await interaction.response.send_message(f"フィルター単語を削除しました: {word}", ephemeral=True)
                 else:
                     await interaction.response.send_message("指定された単語は登録されていません。", ephemeral=True)
@@ -111,26 +233,39 @@ class FilterCommands(commands.Cog):
                     await interaction.response.send_message("単語とペナルティを指定してください。", ephemeral=True)
                     return
                 
-                if word not in self.filtered_words:
+                if word not in filtered_words:
                     await interaction.response.send_message("指定された単語は登録されていません。", ephemeral=True)
                     return
 
-                self.filtered_words[word] = {
+                rule_type = match_type or filtered_words[word].get('type') or LITERAL
+                if rule_type != LITERAL:
+                    try:
+                        compile_rule(rule_type, word)
+                    except ValueError as e:
+                        await interaction.response.send_message(f"パターンを登録できません: {e}", ephemeral=True)
+                        return
+
+                filtered_words[word] = {
                     'penalty': penalty,
-                    'timeout': timeout if penalty == "timeout" else None
+                    'timeout': timeout if penalty == "timeout" else None,
+                    'type': rule_type
                 }
+                guild_filter.rebuild_matcher()
+                self.guild_filters.mark_dirty(interaction.guild.id)
                 await interaction.response.send_message(f"フィルター設定を更新しました: {word}", ephemeral=True)
 
             elif subaction == "list":
-                if not self.filtered_words:
+                if not filtered_words:
                     await interaction.response.send_message("フィルター単語は登録されていません。", ephemeral=True)
                     return
 
                 embed = discord.Embed(title="フィルター単語一覧", color=discord.Color.blue())
-                for word, settings in self.filtered_words.items():
+                for word, settings in filtered_words.items():
                     penalty_str = settings['penalty']
                     if settings['timeout']:
                         penalty_str += f" ({settings['timeout']}分)"
+                    if settings.get('type', LITERAL) != LITERAL:
+                        penalty_str += f" [{settings['type']}]"
                     embed.add_field(name=word, value=penalty_str, inline=False)
                 
                 await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -140,7 +275,9 @@ class FilterCommands(commands.Cog):
                 await interaction.response.send_message("値を指定してください。", ephemeral=True)
                 return
             
-            self.block_urls = value
+            guild_filter.block_urls = value
+            guild_filter.rebuild_detector()
+            self.guild_filters.mark_dirty(interaction.guild.id)
             await interaction.response.send_message(f"URL制限を{'有効' if value else '無効'}にしました。", ephemeral=True)
 
         elif action == "inviteurl-block":
@@ -148,15 +285,69 @@ class FilterCommands(commands.Cog):
                 await interaction.response.send_message("値を指定してください。", ephemeral=True)
                 return
             
-            self.block_invites = value
+            guild_filter.block_invites = value
+            guild_filter.rebuild_detector()
+            self.guild_filters.mark_dirty(interaction.guild.id)
             await interaction.response.send_message(f"招待リンク制限を{'有効' if value else '無効'}にしました。", ephemeral=True)
 
+        elif action == "flood":
+            if value is None:
+                await interaction.response.send_message("値を指定してください。", ephemeral=True)
+                return
+
+            if value:
+                if penalty and penalty not in ["kick", "ban", "timeout"]:
+                    await interaction.response.send_message("無効なペナルティです。", ephemeral=True)
+                    return
+                guild_filter.flood = {
+                    'penalty': penalty,
+                    'timeout': timeout if penalty == "timeout" else None
+                }
+            else:
+                guild_filter.flood = None
+            self.guild_filters.mark_dirty(interaction.guild.id)
+            await interaction.response.send_message(f"連投検知を{'有効' if value else '無効'}にしました。", ephemeral=True)
+
+        elif action == "exempt":
+            if subaction == "list":
+                lines = (
+                    [f"ロール: <@&{role_id}>" for role_id in guild_filter.exempt_roles]
+                    + [f"チャンネル: <#{channel_id}>" for channel_id in guild_filter.exempt_channels]
+                    + [f"カテゴリー: <#{category_id}>" for category_id in guild_filter.exempt_categories]
+                )
+                await interaction.response.send_message(
+                    "\n".join(lines) if lines else "除外設定はありません。",
+                    ephemeral=True
+                )
+                return
+
+            if subaction not in ["add", "remove"] or not any([role, channel, category]):
+                await interaction.response.send_message("add/remove とロール・チャンネル・カテゴリーを指定してください。", ephemeral=True)
+                return
+
+            # frozensets are rebuilt here so the message path only ever does lookups
+            update = frozenset.union if subaction == "add" else frozenset.difference
+            if role:
+                guild_filter.exempt_roles = update(guild_filter.exempt_roles, {role.id})
+            if channel:
+                guild_filter.exempt_channels = update(guild_filter.exempt_channels, {channel.id})
+            if category:
+                guild_filter.exempt_categories = update(guild_filter.exempt_categories, {category.id})
+            self.guild_filters.mark_dirty(interaction.guild.id)
+
+            targets = [target.mention for target in (role, channel, category) if target]
+            await interaction.response.send_message(
+                f"除外設定を{'追加' if subaction == 'add' else '削除'}しました: {', '.join(targets)}",
+                ephemeral=True
+            )
+
         elif action == "log":
             if not channel:
                 await interaction.response.send_message("チャンネルを指定してください。", ephemeral=True)
                 return
             
-            self.log_channel = channel
+            guild_filter.log_channel_id = channel.id
+            self.guild_filters.mark_dirty(interaction.guild.id)
             await interaction.response.send_message(f"ログチャンネルを{channel.mention}に設定しました。", ephemeral=True)
 
     @commands.Cog.listener()
@@ -164,84 +355,158 @@ class FilterCommands(commands.Cog):
         if message.author.bot or not isinstance(message.channel, discord.TextChannel):
             return
 
-        content = message.content.lower()
-        violated = False
-        reason = None
-        detected_word = None
-
-        # Check filtered words
-        for word, settings in self.filtered_words.items():
-            if word.lower() in content:
-                violated = True
-                reason = f"禁止ワード: {word}"
-                detected_word = word
-                await self._handle_violation(message, settings, reason, detected_word)
-                break
-
-        # Check URLs
-        if self.block_urls and not violated:
-            url_pattern = r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+'
-            if re.search(url_pattern, content):
-                violated = True
-                reason = "URL投稿"
-                await self._handle_violation(message, {'penalty': None}, reason, None)
-
-        # Check Discord invites
-        if self.block_invites and not violated:
-            invite_pattern = r'discord\.gg/\w+'
-            if re.search(invite_pattern, content):
-                violated = True
-                reason = "招待リンク"
-                await self._handle_violation(message, {'penalty': None}, reason, None)
-
-        if violated and self.log_channel:
-            embed = discord.Embed(
-                title="ルール違反",
-                description=f"違反者: {message.author.mention} (`{message.author.id}`)\n"
-                           f"理由: {reason}\n"
-                           f"違反回数: {self.violation_counts.get(message.author.id, 0)}",
-                color=discord.Color.red(),
-                timestamp=message.created_at
+        # Loaded once per guild; afterwards this is a single dict lookup
+        guild_filter = self.guild_filters.get(message.guild.id)
+        if guild_filter is None:
+            guild_filter = await self.guild_filters.load(message.guild.id)
+
+        verdict = self.evaluate(message, guild_filter)
+        if verdict is None:
+            return
+
+        if verdict.kind == SHARED_DUPLICATE:
+            await self._clean_shared_duplicate(message)
+            return
+
+        log_channel = message.guild.get_channel(guild_filter.log_channel_id) if guild_filter.log_channel_id else None
+        await self._handle_violation(
+            message, verdict.settings, verdict.reason, verdict.detected_word, log_channel, verdict.warning
+        )
+
+    def evaluate(self, message: discord.Message, guild_filter: GuildFilter, now: Optional[float] = None) -> Optional[Verdict]:
+        """Decide whether a message violates the guild's filter.
+
+        Synchronous and free of REST calls, so the offline replay tool can run
+        it against recorded messages. ``now`` overrides the flood clock.
+        """
+        # Exempt staff, channels and categories before any text is touched.
+        # Member._roles is the raw role ID list, which avoids building Role objects.
+        if guild_filter.is_exempt(message.channel.id, message.channel.category_id, message.author._roles):
+            return None
+
+        flood = None
+        if guild_filter.flood is not None:
+            flood = self.flood.check(message.guild.id, message.author.id, message.content, now)
+
+        detection = guild_filter.detector.classify(message.content)
+        if detection.kind == CLEAN:
+            if flood is None:
+                return None
+            return Verdict(
+                flood,
+                "連投" if flood == RATE else "同一内容の大量投稿",
+                # Someone who posted the flooded text once never reaches the violation path
+                {'penalty': None} if flood == SHARED_DUPLICATE else guild_filter.flood,
+                warning="短時間に大量のメッセージ、または同じ内容のメッセージを送信しないでください。"
             )
-            embed.set_author(name=message.author.display_name, icon_url=message.author.display_avatar.url)
-            embed.add_field(name="メッセージ内容", value=message.content, inline=False)
-            if detected_word:
-                embed.add_field(name="検出された禁止単語", value=detected_word, inline=False)
-            
-            view = ModActionView(message.author.id)
-            await self.log_channel.send(embed=embed, view=view)
+        if detection.kind == WORD:
+            return Verdict(
+                WORD, f"禁止ワード: {detection.word}", guild_filter.filtered_words[detection.word], detection.word
+            )
+        if detection.kind == URL:
+            return Verdict(URL, "URL投稿", {'penalty': None})
+        return Verdict(INVITE, "招待リンク", {'penalty': None})
 
-    async def _handle_violation(self, message: discord.Message, settings: Dict, reason: str, detected_word: Optional[str]):
-        try:
-            # Update violation count
-            user_id = message.author.id
-            self.violation_counts[user_id] = self.violation_counts.get(user_id, 0) + 1
+    async def _handle_violation(
+        self,
+        message: discord.Message,
+        settings: Dict,
+        reason: str,
+        detected_word: Optional[str],
+        log_channel: Optional[discord.TextChannel] = None,
+        warning: Optional[str] = None
+    ):
+        started = time.perf_counter()
 
-            # Delete message
+        # Update violation count
+        self.violations.record(message.guild.id, message.author.id)
+
+        # Delete message first so the content is gone before anything else happens
+        try:
             await message.delete()
+        except Exception as e:
+            logger.warning(f'⚠️ Failed to delete violating message {message.id}: {e}')
 
-            # Send warning to the violator
-            warning_message = (
-                f"{message.author.mention}、現在使用された言葉は、サーバーのルールにより禁止されています"
-                f"{f'(禁止単語: {detected_word})' if detected_word else ''}。\n"
-                "今後、同じ発言が繰り返されると、BanやKickのリスクがあるため、注意をしてください。"
-            )
-            await message.channel.send(warning_message, delete_after=10)
-
-            # Apply penalty if specified
-            if settings['penalty']:
-                if settings['penalty'] == "kick":
-                    await message.author.kick(reason=reason)
-                elif settings['penalty'] == "ban":
-                    await message.author.ban(reason=reason)
-                elif settings['penalty'] == "timeout":
-                    duration = settings.get('timeout', 5)
-                    await message.author.timeout(
-                        duration=datetime.timedelta(minutes=duration),
-                        reason=reason
-                    )
+        # The remaining side effects are independent REST routes; run them together
+        # so one slow or failing route does not hold up or cancel the others
+        routes = {}
+        if warning is None:
+            routes['warning'] = self._send_warning(message, detected_word)
+        elif self.violations.count(message.guild.id, message.author.id, window=30) <= 1:
+            # Only the first message of a flood gets a warning; the rest are just removed
+            routes['warning'] = message.channel.send(f"{message.author.mention}、{warning}", delete_after=10)
+        if settings['penalty'] and (warning is None or self._first_flood_penalty(message.guild.id, message.author.id)):
+            routes['penalty'] = self._apply_penalty(message.author, settings, reason)
+        if log_channel:
+            routes['log'] = self._send_log(log_channel, message, reason, detected_word)
+
+        results = await asyncio.gather(*routes.values(), return_exceptions=True)
+        for route, result in zip(routes, results):
+            if isinstance(result, Exception):
+                logger.error(f'❌ Violation {route} failed for {message.author.id}: {result}')
+
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f'🚨 Violation handled in {elapsed:.0f}ms ({reason}, guild {message.guild.id})')
+
+    async def _clean_shared_duplicate(self, message: discord.Message):
+        """Quietly remove flooded text a member posted only once, and only from new accounts.
+
+        Ordinary members repeating a common greeting are left alone; no
+        warning, violation count or log entry is produced either way.
+        """
+        if discord.utils.utcnow() - message.author.created_at >= NEW_ACCOUNT_AGE:
+            return
+        try:
+            await message.delete()
         except Exception as e:
-            print(f"Error handling violation: {e}")
+            logger.warning(f'⚠️ Failed to delete flooded message {message.id}: {e}')
+
+    def _first_flood_penalty(self, guild_id: int, user_id: int) -> bool:
+        """True once per FLOOD_PENALTY_COOLDOWN for a user, so a burst is penalized once"""
+        if self.flood_penalties.count(guild_id, user_id):
+            return False
+        self.flood_penalties.record(guild_id, user_id)
+        return True
+
+    async def _send_warning(self, message: discord.Message, detected_word: Optional[str]):
+        warning_message = (
+            f"{message.author.mention}、現在使用された言葉は、サーバーのルールにより禁止されています"
+            f"{f'(禁止単語: {detected_word})' if detected_word else ''}。\n"
+            "今後、同じ発言が繰り返されると、BanやKickのリスクがあるため、注意をしてください。"
+        )
+        await message.channel.send(warning_message, delete_after=10)
+
+    async def _apply_penalty(self, member: discord.Member, settings: Dict, reason: str):
+        if settings['penalty'] not in ("kick", "ban", "timeout"):
+            return
+        # The audit log entry can arrive before the REST call returns
+        ledger = self.bot.storage.ledger
+        ledger.expect(member.guild.id, [member.id], settings['penalty'], window=DEDUPE_WINDOW)
+
+        expires_at = None
+        if settings['penalty'] == "kick":
+            await member.kick(reason=reason)
+        elif settings['penalty'] == "ban":
+            await member.ban(reason=reason)
+        elif settings['penalty'] == "timeout":
+            duration = settings.get('timeout') or 5
+            await member.timeout(timedelta(minutes=duration), reason=reason)
+            expires_at = time.time() + duration * 60
+        ledger.record(
+            member.guild.id, member.id, settings['penalty'],
+            moderator_id=self.bot.user.id, reason=reason, source='filter', expires_at=expires_at
+        )
+
+    async def _send_log(
+        self,
+        log_channel: discord.TextChannel,
+        message: discord.Message,
+        reason: str,
+        detected_word: Optional[str]
+    ):
+        # Queued rather than sent so a raid produces a few batched messages, not one per violation
+        recent_count = self.violations.count(message.guild.id, message.author.id)
+        self.log_batcher.add(log_channel, message, reason, detected_word, recent_count)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(FilterCommands(bot))
@@ -74,6 +74,11 @@ class HelpCommands(commands.Cog):
                           "- ban: サーバーからBAN\n"
                           "- timeout: 一時的なミュート\n"
                           "timeout: タイムアウト時間（分）\n"
+                          "match_type: 一致方法\n"
+                          "- literal: 部分一致 (既定)\n"
+                          "- wildcard: * と ? を使用\n"
+                          "- word: 単語単位で一致\n"
+                          "- regex: 正規表現\n"
                           "```",
                     inline=False
                 )
@@ -94,6 +99,8 @@ class HelpCommands(commands.Cog):
                           "word edit: 禁止ワードの設定を変更\n"
                           "word list: 禁止ワード一覧を表示\n"
                           "log: ログチャンネルを設定\n"
+                          "flood: 連投・同一内容の大量投稿を検知\n"
+                          "exempt add/remove/list: ロール・チャンネル・カテゴリーを除外\n"
                           "```",
                     inline=False
                 )
@@ -154,6 +161,11 @@ class HelpCommands(commands.Cog):
                           "```",
                     inline=False
                 )
+                embed.add_field(
+                    name="/log_status",
+                    value="ログ送信キューの待機数・破棄数とメッセージキャッシュの使用量を表示",
+                    inline=False
+                )
                 embed.add_field(
                     name="記録される項目",
                     value="```\n"
@@ -244,7 +256,9 @@ class HelpCommands(commands.Cog):
                       "/filter - コンテンツフィルターを設定\n"
                       "/timeout - タイムアウトを管理\n"
                       "/nick - ニックネームを変更\n"
-                      "/clear - メッセージを一括削除\n"
+                      "/clear - メッセージを一括削除 (ユーザー・内容・期間で絞り込み可)\n"
+                      "/raidclean - 荒らしのメッセージを全チャンネルから削除\n"
+                      "/bulk - 複数のメンバーを一括でBAN/KICK/タイムアウト\n"
                       "/nuke - チャンネルを初期化\n"
                       "```",
                 inline=False
@@ -253,6 +267,7 @@ class HelpCommands(commands.Cog):
                 name="📝 ログ管理",
                 value="```\n"
                       "/log - ログチャンネルを設定\n"
+                      "/log_status - ログ送信キューの状態を表示\n"
                       "```",
                 inline=False
             )
@@ -1,13 +1,109 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
+import asyncio
+import io
+import logging
+import os
+
+from utils.log_sink import LogSink
+from utils.members import display_name_for, resolve_member
+from utils.message_cache import CachedMessage, MessageCache
+
+logger = logging.getLogger('discord')
+
+CACHE_SWEEP_INTERVAL = 300  # seconds between sweeps of expired cached messages
+
+# 利用可能なイベント一覧
+LOG_EVENTS = {
+    "message_edit": "メッセージ編集",
+    "message_delete": "メッセージ削除",
+    "channel_create": "チャンネル作成",
+    "channel_delete": "チャンネル削除",
+    "channel_edit": "チャンネル設定変更",
+    "webhook_create": "Webhook作成",
+    "webhook_delete": "Webhook削除",
+    "webhook_edit": "Webhook設定変更",
+    "emoji_add": "絵文字追加",
+    "emoji_remove": "絵文字削除",
+    "emoji_edit": "絵文字変更",
+    "role_create": "ロール作成",
+    "role_delete": "ロール削除",
+    "role_edit": "ロール設定変更",
+    "member_join": "メンバー参加",
+    "member_leave": "メンバー退出",
+    "member_update": "メンバー情報更新",
+    "member_ban": "メンバーBAN",
+    "member_unban": "メンバーBAN解除",
+    "member_timeout": "メンバータイムアウト"
+}
+
+# Each event is one bit; a channel's subscriptions are the OR of its events
+EVENT_BITS = {event: 1 << index for index, event in enumerate(LOG_EVENTS)}
+ALL_EVENTS = (1 << len(LOG_EVENTS)) - 1
+# Events that need the local message cache
+CACHED_EVENTS = EVENT_BITS["message_edit"] | EVENT_BITS["message_delete"]
+
+def events_to_mask(events: List[str]) -> int:
+    if "all" in events:
+        return ALL_EVENTS
+    mask = 0
+    for event in events:
+        mask |= EVENT_BITS.get(event, 0)
+    return mask
+
+def mask_to_events(mask: int) -> List[str]:
+    return [event for event, bit in EVENT_BITS.items() if mask & bit]
+
+def load_subscriptions(data: Dict[str, List[str]]) -> Dict[int, int]:
+    """Stored {"channel_id": [event, ...]} -> {channel_id: mask}"""
+    return {int(channel_id): events_to_mask(events) for channel_id, events in data.items()}
+
+def dump_subscriptions(subscriptions: Dict[int, int]) -> Dict[str, List[str]]:
+    # Stored by event name so adding events never shifts existing subscriptions
+    return {str(channel_id): mask_to_events(mask) for channel_id, mask in subscriptions.items()}
+
+# Webhook changes only arrive with details through the audit log
+WEBHOOK_ACTIONS = {
+    discord.AuditLogAction.webhook_create: "webhook_create",
+    discord.AuditLogAction.webhook_delete: "webhook_delete",
+    discord.AuditLogAction.webhook_update: "webhook_edit"
+}
 
 class LogCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.log_settings: Dict[str, Dict] = {}  # guild_id -> settings
+        # guild_id -> channel_id -> event mask
+        self.log_settings = bot.storage.cache('log', dict, load_subscriptions, dump_subscriptions)
+        # Reverse index built from log_settings: (guild_id, event) -> log channel IDs,
+        # plus the OR of every channel's mask per guild for a one-bit early exit
+        self._routes: Dict[Tuple[int, str], Tuple[int, ...]] = {}
+        self._masks: Dict[int, int] = {}
+        self.sink = LogSink(bot.get_channel)
+        # Content of recent messages for edit/delete logs, sized by environment
+        self.messages = MessageCache(
+            int(os.getenv('LOG_CACHE_MESSAGES', '5000')),
+            float(os.getenv('LOG_CACHE_MAX_AGE', '86400'))
+        )
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def cog_unload(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+        await self.sink.close()
+
+    async def _sweep_loop(self):
+        # Quiet guilds get no new messages to trigger expiry, so age them out here
+        while True:
+            await asyncio.sleep(CACHE_SWEEP_INTERVAL)
+            dropped = self.messages.sweep()
+            if dropped:
+                logger.info(f'🧹 Dropped {dropped} expired cached messages')
 
     @app_commands.command(name="log", description="ログの設定を管理")
     @app_commands.describe(
@@ -31,40 +127,11 @@ class LogCommands(commands.Cog):
             await interaction.response.send_message("管理者権限が必要です！", ephemeral=True)
             return
 
-        guild_id = str(interaction.guild.id)
+        settings = await self.log_settings.load(interaction.guild.id)
         
-        # 利用可能なイベント一覧
-        available_events = {
-            "all": "すべてのイベント",
-            "message_edit": "メッセージ編集",
-            "message_delete": "メッセージ削除",
-            "channel_create": "チャンネル作成",
-            "channel_delete": "チャンネル削除",
-            "channel_edit": "チャンネル設定変更",
-            "webhook_create": "Webhook作成",
-            "webhook_delete": "Webhook削除",
-            "webhook_edit": "Webhook設定変更",
-            "emoji_add": "絵文字追加",
-            "emoji_remove": "絵文字削除",
-            "emoji_edit": "絵文字変更",
-            "role_create": "ロール作成",
-            "role_delete": "ロール削除",
-            "role_edit": "ロール設定変更",
-            "member_join": "メンバー参加",
-            "member_leave": "メンバー退出",
-            "member_update": "メンバー情報更新",
-            "member_ban": "メンバーBAN",
-            "member_unban": "メンバーBAN解除",
-            "member_timeout": "メンバータイムアウト"
-        }
+        available_events = {"all": "すべてのイベント", **LOG_EVENTS}
 
         if action == "add":
-            if guild_id not in self.log_settings:
-                self.log_settings[guild_id] = {}
-            
-            if str(channel.id) not in self.log_settings[guild_id]:
-                self.log_settings[guild_id][str(channel.id)] = []
-
             if not events:
                 # イベント指定がない場合は選択肢を表示
                 embed = discord.Embed(
@@ -85,17 +152,15 @@ class LogCommands(commands.Cog):
             invalid_events = []
             
             for event in requested_events:
-                if event in available_events or event == "all":
+                if event in available_events:
                     valid_events.append(event)
                 else:
                     invalid_events.append(event)
 
             if valid_events:
-                if "all" in valid_events:
-                    self.log_settings[guild_id][str(channel.id)] = list(available_events.keys())
-                else:
-                    self.log_settings[guild_id][str(channel.id)].extend(valid_events)
-                    self.log_settings[guild_id][str(channel.id)] = list(set(self.log_settings[guild_id][str(channel.id)]))
+                settings[channel.id] = settings.get(channel.id, 0) | events_to_mask(valid_events)
+                self.log_settings.mark_dirty(interaction.guild.id)
+                self._reindex(interaction.guild.id, settings)
 
             response = []
             if valid_events:
@@ -106,13 +171,15 @@ class LogCommands(commands.Cog):
             await interaction.response.send_message("\n".join(response), ephemeral=True)
 
         elif action == "remove":
-            if not guild_id in self.log_settings or not str(channel.id) in self.log_settings[guild_id]:
+            if channel.id not in settings:
                 await interaction.response.send_message("このチャンネルにはログ設定がありません。", ephemeral=True)
                 return
 
             if not events:
                 # チャンネルの全設定を削除
-                del self.log_settings[guild_id][str(channel.id)]
+                del settings[channel.id]
+                self.log_settings.mark_dirty(interaction.guild.id)
+                self._reindex(interaction.guild.id, settings)
                 await interaction.response.send_message(f"{channel.mention} のすべてのログ設定を削除しました。", ephemeral=True)
                 return
 
@@ -122,12 +189,19 @@ class LogCommands(commands.Cog):
             not_found_events = []
 
             for event in requested_events:
-                if event in self.log_settings[guild_id][str(channel.id)]:
-                    self.log_settings[guild_id][str(channel.id)].remove(event)
+                bit = events_to_mask([event])
+                if bit and settings[channel.id] & bit:
+                    settings[channel.id] &= ~bit
                     removed_events.append(event)
                 else:
                     not_found_events.append(event)
 
+            if removed_events:
+                if not settings[channel.id]:
+                    del settings[channel.id]
+                self.log_settings.mark_dirty(interaction.guild.id)
+                self._reindex(interaction.guild.id, settings)
+
             response = []
             if removed_events:
                 response.append(f"✅ {channel.mention} から以下のログを削除しました：\n" + ", ".join(removed_events))
@@ -136,5 +210,441 @@ class LogCommands(commands.Cog):
 
             await interaction.response.send_message("\n".join(response), ephemeral=True)
 
-    # 以下、各種イベントリスナーの実装...
-    # (既存のイベントリスナーはそのまま維持)
+    @app_commands.command(name="log_status", description="ログ送信キューとメッセージキャッシュの状態を表示")
+    @app_commands.default_permissions(administrator=True)
+    async def log_status(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("管理者権限が必要です！", ephemeral=True)
+            return
+
+        settings = await self.log_settings.load(interaction.guild.id)
+        stats = self.sink.stats(list(settings))
+
+        embed = discord.Embed(title="ログ送信キューの状態", color=discord.Color.blue())
+        for channel_id, counters in stats.items():
+            embed.add_field(
+                name=f"#{getattr(interaction.guild.get_channel(channel_id), 'name', channel_id)}",
+                value=f"待機中: {counters['depth']}\n"
+                      f"送信済み: {counters['sent']} ({counters['batches']}回)\n"
+                      f"破棄: {counters['dropped']} / 失敗: {counters['failed']}",
+                inline=True
+            )
+        if not stats:
+            embed.description = "まだ送信されたログはありません。"
+
+        cached, size = self.messages.guild_stats(interaction.guild.id)
+        embed.add_field(
+            name="メッセージキャッシュ",
+            value=f"このサーバー: {cached}件 ({size / 1024:.1f} KiB)\n"
+                  f"全体: {len(self.messages)}件 ({self.messages.memory / 1024:.1f} KiB)\n"
+                  f"上限: サーバーごとに{self.messages.max_messages}件 / {self.messages.max_age / 3600:g}時間",
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    def _reindex(self, guild_id: int, settings: Dict[int, int]):
+        """Rebuild the (guild_id, event) -> channel index for one guild"""
+        for event in LOG_EVENTS:
+            self._routes.pop((guild_id, event), None)
+
+        guild_mask = 0
+        for event, bit in EVENT_BITS.items():
+            channel_ids = tuple(channel_id for channel_id, mask in settings.items() if mask & bit)
+            if channel_ids:
+                self._routes[(guild_id, event)] = channel_ids
+                guild_mask |= bit
+        self._masks[guild_id] = guild_mask
+
+    async def _guild_mask(self, guild_id: int) -> int:
+        """Every event some channel in the guild subscribes to"""
+        mask = self._masks.get(guild_id)
+        if mask is None:
+            self._reindex(guild_id, await self.log_settings.load(guild_id))
+            mask = self._masks[guild_id]
+        return mask
+
+    async def _targets(self, guild_id: int, event: str) -> Tuple[int, ...]:
+        """Log channel IDs subscribed to an event; a bit test and one dict lookup once indexed"""
+        if not await self._guild_mask(guild_id) & EVENT_BITS[event]:
+            return ()
+        return self._routes[(guild_id, event)]
+
+    async def _send(self, guild: discord.Guild, channel_ids: Tuple[int, ...], embed: discord.Embed):
+        # Queued per channel; the sink coalesces bursts into multi-embed messages
+        for channel_id in channel_ids:
+            await self.sink.submit(channel_id, embed)
+
+    @staticmethod
+    def _embed(title: str, description: str, color: discord.Color) -> discord.Embed:
+        return discord.Embed(title=title, description=description, color=color, timestamp=discord.utils.utcnow())
+
+    @staticmethod
+    def _changes(before, after, attributes: Dict[str, str]) -> List[str]:
+        """「項目: 変更前 → 変更後」 lines for attributes that differ"""
+        lines = []
+        for attribute, label in attributes.items():
+            old, new = getattr(before, attribute, None), getattr(after, attribute, None)
+            if old != new:
+                lines.append(f"{label}: {old} → {new}")
+        return lines
+
+    # メッセージ
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or message.author.bot:
+            return
+        # Only guilds that log edits or deletes pay for the cache
+        guild_id = message.guild.id
+        if await self._guild_mask(guild_id) & CACHED_EVENTS:
+            self.messages.add(guild_id, CachedMessage.from_message(message))
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.messages.remove_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        content = payload.data.get('content')
+        # Link unfurls also arrive as updates, without an edit timestamp
+        if payload.guild_id is None or content is None or not payload.data.get('edited_timestamp'):
+            return
+        author = payload.data.get('author')
+        if author is None or author.get('bot'):
+            return
+
+        previous = self.messages.update(payload.guild_id, payload.message_id, content)
+        if previous == content:
+            return
+        channel_ids = await self._targets(payload.guild_id, "message_edit")
+        if not channel_ids:
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild is None:
+            return
+
+        author_id = int(author['id'])
+        jump_url = f"https://discord.com/channels/{payload.guild_id}/{payload.channel_id}/{payload.message_id}"
+        embed = self._embed(
+            "メッセージ編集",
+            f"<@{author_id}> が <#{payload.channel_id}> でメッセージを編集しました\n[メッセージへ移動]({jump_url})",
+            discord.Color.orange()
+        )
+        embed.add_field(
+            name="編集前",
+            value=(previous[:1024] or "(なし)") if previous is not None else "(キャッシュ外のため不明)",
+            inline=False
+        )
+        embed.add_field(name="編集後", value=content[:1024] or "(なし)", inline=False)
+        embed.set_footer(text=f"ユーザーID: {author_id}")
+        await self._send(guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if payload.guild_id is None:
+            return
+        record = self.messages.pop(payload.guild_id, payload.message_id)
+        if record is None and payload.cached_message is not None and not payload.cached_message.author.bot:
+            record = CachedMessage.from_message(payload.cached_message)
+        if record is None:
+            return  # never seen, or a bot message
+        channel_ids = await self._targets(payload.guild_id, "message_delete")
+        if not channel_ids:
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild is None:
+            return
+
+        embed = self._embed(
+            "メッセージ削除",
+            f"<@{record.author_id}> のメッセージが <#{record.channel_id}> で削除されました",
+            discord.Color.red()
+        )
+        embed.add_field(name="内容", value=record.content[:1024] or "(なし)", inline=False)
+        if record.attachments:
+            embed.add_field(name="添付ファイル", value="\n".join(record.attachments)[:1024], inline=False)
+        embed.set_footer(text=f"ユーザーID: {record.author_id} | メッセージID: {record.id}")
+        await self._send(guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        # /clear and other purges: one transcript file instead of one embed per message
+        if payload.guild_id is None:
+            return
+        records = self.messages.pop_many(payload.guild_id, payload.message_ids)
+        known = {record.id for record in records}
+        records.extend(
+            CachedMessage.from_message(message) for message in payload.cached_messages
+            if message.id not in known
+        )
+
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild is None:
+            return
+        channel_ids = await self._targets(guild.id, "message_delete")
+        if not channel_ids:
+            return
+
+        channel = guild.get_channel(payload.channel_id)
+        channel_name = channel.name if channel else str(payload.channel_id)
+        transcript = self._transcript(guild, channel_name, payload.message_ids, records)
+
+        embed = self._embed(
+            "メッセージ一括削除",
+            f"<#{payload.channel_id}> で {len(payload.message_ids)} 件のメッセージが削除されました\n"
+            f"(内容を記録できたメッセージ: {len(records)} 件)",
+            discord.Color.red()
+        )
+        filename = f"deleted-{payload.channel_id}-{discord.utils.utcnow():%Y%m%d-%H%M%S}.txt"
+
+        # Rendered once; each destination gets its own File over the same bytes
+        sends = []
+        for channel_id in channel_ids:
+            log_channel = guild.get_channel(channel_id)
+            if log_channel is not None:
+                sends.append(log_channel.send(embed=embed, file=discord.File(io.BytesIO(transcript), filename=filename)))
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f'❌ Failed to send bulk delete log in guild {guild.id}: {result}')
+
+    @staticmethod
+    def _transcript(guild: discord.Guild, channel_name: str, message_ids, records: List[CachedMessage]) -> bytes:
+        """Plain-text transcript of a bulk delete, oldest first, from cached records only"""
+        cached = {record.id: record for record in records}
+        buffer = io.StringIO()
+        buffer.write(f"#{channel_name} - 削除されたメッセージ {len(message_ids)} 件\n\n")
+        for message_id in sorted(message_ids):
+            created = discord.utils.snowflake_time(message_id)
+            record = cached.get(message_id)
+            if record is None:
+                buffer.write(f"[{created:%Y-%m-%d %H:%M:%S}] (内容なし: キャッシュ外のメッセージ {message_id})\n")
+                continue
+            author = display_name_for(guild, record.author_id)
+            buffer.write(f"[{created:%Y-%m-%d %H:%M:%S}] {author} ({record.author_id}): {record.content}\n")
+            for url in record.attachments:
+                buffer.write(f"    添付: {url}\n")
+        return buffer.getvalue().encode('utf-8')
+
+    # チャンネル
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        channel_ids = await self._targets(channel.guild.id, "channel_create")
+        if channel_ids:
+            embed = self._embed("チャンネル作成", f"{channel.mention} (`{channel.name}`) が作成されました", discord.Color.green())
+            embed.set_footer(text=f"チャンネルID: {channel.id}")
+            await self._send(channel.guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        channel_ids = await self._targets(channel.guild.id, "channel_delete")
+        if channel_ids:
+            embed = self._embed("チャンネル削除", f"`{channel.name}` が削除されました", discord.Color.red())
+            embed.set_footer(text=f"チャンネルID: {channel.id}")
+            await self._send(channel.guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        channel_ids = await self._targets(after.guild.id, "channel_edit")
+        if not channel_ids:
+            return
+
+        changes = self._changes(before, after, {
+            'name': "名前",
+            'category': "カテゴリー",
+            'topic': "トピック",
+            'nsfw': "NSFW",
+            'slowmode_delay': "低速モード",
+            'user_limit': "人数制限"
+        })
+        if before.overwrites != after.overwrites:
+            changes.append("権限の上書きが変更されました")
+        if not changes:
+            return
+
+        embed = self._embed("チャンネル設定変更", f"{after.mention} の設定が変更されました", discord.Color.orange())
+        embed.add_field(name="変更内容", value="\n".join(changes)[:1024], inline=False)
+        embed.set_footer(text=f"チャンネルID: {after.id}")
+        await self._send(after.guild, channel_ids, embed)
+
+    # Webhook
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        event = WEBHOOK_ACTIONS.get(entry.action)
+        if event is None:
+            return
+        channel_ids = await self._targets(entry.guild.id, event)
+        if not channel_ids:
+            return
+
+        user = entry.user or await resolve_member(entry.guild, entry.user_id)
+        name = getattr(entry.after, 'name', None) or getattr(entry.before, 'name', None) or "(不明)"
+        channel = getattr(entry.after, 'channel', None) or getattr(entry.before, 'channel', None)
+
+        title = LOG_EVENTS[event]
+        color = {"webhook_create": discord.Color.green(), "webhook_delete": discord.Color.red()}.get(event, discord.Color.orange())
+        embed = self._embed(title, f"Webhook `{name}` ({title})", color)
+        if channel is not None:
+            embed.add_field(name="チャンネル", value=channel.mention, inline=True)
+        embed.add_field(name="実行者", value=user.mention if user else f"`{entry.user_id}`", inline=True)
+        if event == "webhook_edit":
+            changes = self._changes(entry.before, entry.after, {'name': "名前", 'channel': "チャンネル"})
+            if changes:
+                embed.add_field(name="変更内容", value="\n".join(changes)[:1024], inline=False)
+        embed.set_footer(text=f"WebhookID: {entry.target.id if entry.target else '不明'}")
+        await self._send(entry.guild, channel_ids, embed)
+
+    # 絵文字
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild: discord.Guild, before, after):
+        old = {emoji.id: emoji for emoji in before}
+        new = {emoji.id: emoji for emoji in after}
+
+        added = [emoji for emoji_id, emoji in new.items() if emoji_id not in old]
+        removed = [emoji for emoji_id, emoji in old.items() if emoji_id not in new]
+        renamed = [(old[emoji_id], emoji) for emoji_id, emoji in new.items() if emoji_id in old and old[emoji_id].name != emoji.name]
+
+        if added and (channel_ids := await self._targets(guild.id, "emoji_add")):
+            embed = self._embed("絵文字追加", "\n".join(f"{emoji} `:{emoji.name}:`" for emoji in added)[:4096], discord.Color.green())
+            await self._send(guild, channel_ids, embed)
+        if removed and (channel_ids := await self._targets(guild.id, "emoji_remove")):
+            embed = self._embed("絵文字削除", "\n".join(f"`:{emoji.name}:`" for emoji in removed)[:4096], discord.Color.red())
+            await self._send(guild, channel_ids, embed)
+        if renamed and (channel_ids := await self._targets(guild.id, "emoji_edit")):
+            embed = self._embed(
+                "絵文字変更",
+                "\n".join(f"{emoji} `:{before_emoji.name}:` → `:{emoji.name}:`" for before_emoji, emoji in renamed)[:4096],
+                discord.Color.orange()
+            )
+            await self._send(guild, channel_ids, embed)
+
+    # ロール
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        channel_ids = await self._targets(role.guild.id, "role_create")
+        if channel_ids:
+            embed = self._embed("ロール作成", f"{role.mention} (`{role.name}`) が作成されました", discord.Color.green())
+            embed.set_footer(text=f"ロールID: {role.id}")
+            await self._send(role.guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        channel_ids = await self._targets(role.guild.id, "role_delete")
+        if channel_ids:
+            embed = self._embed("ロール削除", f"`{role.name}` が削除されました", discord.Color.red())
+            embed.set_footer(text=f"ロールID: {role.id}")
+            await self._send(role.guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        channel_ids = await self._targets(after.guild.id, "role_edit")
+        if not channel_ids:
+            return
+
+        changes = self._changes(before, after, {
+            'name': "名前",
+            'color': "色",
+            'hoist': "別表示",
+            'mentionable': "メンション可能"
+        })
+        if before.permissions != after.permissions:
+            granted = [name for name, value in after.permissions if value and not getattr(before.permissions, name)]
+            revoked = [name for name, value in before.permissions if value and not getattr(after.permissions, name)]
+            if granted:
+                changes.append(f"付与された権限: {', '.join(granted)}")
+            if revoked:
+                changes.append(f"削除された権限: {', '.join(revoked)}")
+        if not changes:
+            return  # position shifts caused by other roles
+
+        embed = self._embed("ロール設定変更", f"{after.mention} の設定が変更されました", discord.Color.orange())
+        embed.add_field(name="変更内容", value="\n".join(changes)[:1024], inline=False)
+        embed.set_footer(text=f"ロールID: {after.id}")
+        await self._send(after.guild, channel_ids, embed)
+
+    # メンバー
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        channel_ids = await self._targets(member.guild.id, "member_join")
+        if not channel_ids:
+            return
+
+        embed = self._embed("メンバー参加", f"{member.mention} (`{member}`) が参加しました", discord.Color.green())
+        embed.add_field(name="アカウント作成日", value=discord.utils.format_dt(member.created_at, 'R'), inline=True)
+        embed.add_field(name="メンバー数", value=str(member.guild.member_count), inline=True)
+        embed.set_thumbnail(url=member.display_avatar.url)
+        embed.set_footer(text=f"ユーザーID: {member.id}")
+        await self._send(member.guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        # Raw event so members missing from the cache are still logged
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild is None:
+            return
+        channel_ids = await self._targets(guild.id, "member_leave")
+        if not channel_ids:
+            return
+
+        user = payload.user
+        embed = self._embed("メンバー退出", f"{user.mention} (`{user}`) が退出しました", discord.Color.red())
+        if isinstance(user, discord.Member) and user.joined_at:
+            embed.add_field(name="参加日", value=discord.utils.format_dt(user.joined_at, 'R'), inline=True)
+        embed.set_thumbnail(url=user.display_avatar.url)
+        embed.set_footer(text=f"ユーザーID: {user.id}")
+        await self._send(guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        guild = after.guild
+
+        if before.timed_out_until != after.timed_out_until:
+            channel_ids = await self._targets(guild.id, "member_timeout")
+            if channel_ids:
+                if after.is_timed_out():
+                    description = f"{after.mention} が {discord.utils.format_dt(after.timed_out_until)} までタイムアウトされました"
+                    color = discord.Color.dark_orange()
+                else:
+                    description = f"{after.mention} のタイムアウトが解除されました"
+                    color = discord.Color.green()
+                embed = self._embed("メンバータイムアウト", description, color)
+                embed.set_footer(text=f"ユーザーID: {after.id}")
+                await self._send(guild, channel_ids, embed)
+
+        changes = self._changes(before, after, {'nick': "ニックネーム"})
+        if before._roles != after._roles:
+            added = [role.mention for role in after.roles if role not in before.roles]
+            removed = [role.mention for role in before.roles if role not in after.roles]
+            if added:
+                changes.append(f"追加されたロール: {' '.join(added)}")
+            if removed:
+                changes.append(f"削除されたロール: {' '.join(removed)}")
+        if not changes:
+            return
+        channel_ids = await self._targets(guild.id, "member_update")
+        if not channel_ids:
+            return
+
+        embed = self._embed("メンバー情報更新", f"{after.mention} の情報が更新されました", discord.Color.blue())
+        embed.add_field(name="変更内容", value="\n".join(changes)[:1024], inline=False)
+        embed.set_footer(text=f"ユーザーID: {after.id}")
+        await self._send(guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        channel_ids = await self._targets(guild.id, "member_ban")
+        if channel_ids:
+            embed = self._embed("メンバーBAN", f"{user.mention} (`{user}`) がBANされました", discord.Color.dark_red())
+            embed.set_thumbnail(url=user.display_avatar.url)
+            embed.set_footer(text=f"ユーザーID: {user.id}")
+            await self._send(guild, channel_ids, embed)
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        channel_ids = await self._targets(guild.id, "member_unban")
+        if channel_ids:
+            embed = self._embed("メンバーBAN解除", f"{user.mention} (`{user}`) のBANが解除されました", discord.Color.green())
+            embed.set_footer(text=f"ユーザーID: {user.id}")
+            await self._send(guild, channel_ids, embed)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(LogCommands(bot))
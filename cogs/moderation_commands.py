@@ -1,60 +1,407 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple
+from datetime import timedelta
+import io
+import logging
 import re
 
+import regex
+
+from utils.ban_list import BanListView, BanPager
+from utils.bulk_actions import (
+    BANNED, FAILED, KICKED, NOT_FOUND, SUCCESS, TIMED_OUT, BulkConfirmView, BulkProgress, bulk_moderate
+)
+from utils.filter_engine import PATTERN_TIMEOUT, compile_pattern
+from utils.mod_ledger import LedgerListView, LedgerPager
+from utils.purge import PurgeFilter, PurgeProgress, purge, purge_channels
+
+logger = logging.getLogger('discord')
+
+MAX_CLEAR = 10_000
+MAX_CLEAR_SCAN = 20_000  # history messages /clear inspects when filtering without a time window
+RAID_CLEAN_CONCURRENCY = 4  # channels purged at once by /raidclean
+MAX_BULK_TARGETS = 1000
+
+# action -> (label, required permission)
+BULK_ACTIONS = {
+    'ban': ("BAN", 'ban_members'),
+    'kick': ("KICK", 'kick_members'),
+    'timeout': ("タイムアウト", 'moderate_members'),
+}
+BULK_RESULT_LABELS = {
+    BANNED: "BAN済み", KICKED: "KICK済み", TIMED_OUT: "タイムアウト済み",
+    NOT_FOUND: "見つかりません", FAILED: "失敗"
+}
+
 class ModerationCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        # Kicks, bans and timeouts by anyone, so /list never has to scan the audit log
+        self.bot.storage.ledger.record_audit_entry(entry, self.bot.user.id)
+
     @app_commands.command(name="clear", description="メッセージを一括削除")
     @app_commands.describe(
-        amount="削除するメッセージ数 (1-100)",
-        user="特定のユーザーのメッセージのみ削除"
+        amount=f"削除するメッセージ数 (1-{MAX_CLEAR})",
+        user="特定のユーザーのメッセージのみ削除",
+        contains="この文字列を含むメッセージのみ削除",
+        minutes="直近N分以内のメッセージのみ削除"
     )
     @app_commands.default_permissions(manage_messages=True)
     async def clear(
         self,
         interaction: discord.Interaction,
         amount: int,
-        user: Optional[discord.Member] = None
+        user: Optional[discord.Member] = None,
+        contains: Optional[str] = None,
+        minutes: Optional[int] = None
     ):
         if not interaction.user.guild_permissions.manage_messages:
             await interaction.response.send_message("メッセージの管理権限が必要です！", ephemeral=True)
             return
 
-        if amount < 1 or amount > 100:
-            await interaction.response.send_message("1から100の間で指定してください！", ephemeral=True)
+        if amount < 1 or amount > MAX_CLEAR:
+            await interaction.response.send_message(f"1から{MAX_CLEAR}の間で指定してください！", ephemeral=True)
             return
 
         await interaction.response.defer(ephemeral=True)
 
-        if user:
-            messages = []
-            async for message in interaction.channel.history(limit=100):
-                if message.author == user:
-                    messages.append(message)
-                    if len(messages) >= amount:
-                        break
-            
-            if messages:
-                await interaction.channel.delete_messages(messages)
-                await interaction.followup.send(
-                    f"{user.mention} のメッセージを {len(messages)}件 削除しました。",
-                    ephemeral=True
-                )
-            else:
-                await interaction.followup.send(
-                    f"{user.mention} の最近のメッセージは見つかりませんでした。",
-                    ephemeral=True
-                )
-        else:
-            deleted = await interaction.channel.purge(limit=amount)
+        check = PurgeFilter(user.id if user else None, contains)
+        after = discord.utils.utcnow() - timedelta(minutes=minutes) if minutes else None
+        # A filter may skip most of the history; bound the scan unless a time window already does
+        max_scan = amount if check.is_empty else (None if after else MAX_CLEAR_SCAN)
+
+        status = await interaction.followup.send("🧹 削除を開始します...", ephemeral=True, wait=True)
+
+        async def report(progress: PurgeProgress):
+            await status.edit(content=self._purge_status(progress))
+
+        try:
+            result = await purge(
+                interaction.channel, check, amount,
+                after=after, max_scan=max_scan, on_progress=report,
+                reason=f"/clear by {interaction.user}"
+            )
+        except discord.Forbidden:
+            await self._finish_status(interaction, status, "メッセージ履歴の閲覧またはメッセージの管理権限がBOTにありません。")
+            return
+
+        if result.deleted == 0 and result.failed == 0:
+            target = f"{user.mention} の" if user else "条件に一致する"
+            await self._finish_status(interaction, status, f"{target}メッセージは見つかりませんでした。")
+            return
+
+        target = f"{user.mention} のメッセージを" if user else "メッセージを"
+        summary = f"{target} {result.deleted}件 削除しました。"
+        if result.single_deleted:
+            summary += f"\n(14日以上前のメッセージ {result.single_deleted}件 は個別に削除しました)"
+        if result.failed:
+            summary += f"\n⚠️ {result.failed}件 は削除できませんでした。"
+        await self._finish_status(interaction, status, summary)
+
+    @app_commands.command(name="raidclean", description="荒らしのメッセージを全チャンネルから削除")
+    @app_commands.describe(
+        user="メッセージを削除するユーザー",
+        joined_minutes="直近N分以内に参加したメンバーのメッセージを削除",
+        minutes="直近N分以内のメッセージのみ対象 (省略時はjoined_minutes)"
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def raidclean(
+        self,
+        interaction: discord.Interaction,
+        user: Optional[discord.Member] = None,
+        joined_minutes: Optional[int] = None,
+        minutes: Optional[int] = None
+    ):
+        if not interaction.user.guild_permissions.manage_messages:
+            await interaction.response.send_message("メッセージの管理権限が必要です！", ephemeral=True)
+            return
+
+        if not user and not joined_minutes:
+            await interaction.response.send_message("userまたはjoined_minutesを指定してください。", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        guild = interaction.guild
+        now = discord.utils.utcnow()
+        targets = {user.id} if user else set()
+        after = None
+        if joined_minutes:
+            joined_since = now - timedelta(minutes=joined_minutes)
+            targets.update(
+                member.id for member in guild.members
+                if member.joined_at and member.joined_at >= joined_since and not member.bot
+            )
+            # Raiders cannot have posted before they joined, which bounds every channel's scan
+            after = joined_since
+        if minutes:
+            after = now - timedelta(minutes=minutes)
+
+        if not targets:
+            await interaction.followup.send("対象のメンバーが見つかりませんでした。", ephemeral=True)
+            return
+
+        channels = [
+            channel for channel in guild.text_channels
+            if channel.permissions_for(guild.me).manage_messages
+            and channel.permissions_for(guild.me).read_message_history
+        ]
+        status = await interaction.followup.send(
+            f"🧹 {len(targets)}人のメッセージを {len(channels)}チャンネルから削除します...",
+            ephemeral=True,
+            wait=True
+        )
+
+        async def report(progress: PurgeProgress):
+            await status.edit(content=self._purge_status(progress))
+
+        results = await purge_channels(
+            channels,
+            lambda message: message.author.id in targets,
+            MAX_CLEAR,
+            concurrency=RAID_CLEAN_CONCURRENCY,
+            on_progress=report,
+            after=after,
+            max_scan=None if after else MAX_CLEAR_SCAN,
+            reason=f"/raidclean by {interaction.user}"
+        )
+
+        total = PurgeProgress.total(results.values())
+        busiest = sorted(
+            ((channel, progress) for channel, progress in results.items() if progress.deleted),
+            key=lambda item: item[1].deleted,
+            reverse=True
+        )
+        lines = [f"{len(targets)}人のメッセージを {total.deleted}件 削除しました。"]
+        lines.extend(f"{channel.mention}: {progress.deleted}件" for channel, progress in busiest[:10])
+        if len(busiest) > 10:
+            lines.append(f"...他 {len(busiest) - 10}チャンネル")
+        if total.failed:
+            lines.append(f"⚠️ {total.failed}件 は削除できませんでした。")
+        await self._finish_status(interaction, status, "\n".join(lines))
+
+    @app_commands.command(name="bulk", description="複数のメンバーを一括でBAN/KICK/タイムアウト")
+    @app_commands.describe(
+        action="実行する処理",
+        joined_minutes="直近N分以内に参加したメンバーを対象にする",
+        name_pattern="名前がこの正規表現に一致するメンバーを対象にする",
+        user_ids="対象のユーザーID (空白またはカンマ区切り)",
+        reason="理由",
+        timeout="タイムアウト時間（分）"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="BAN", value="ban"),
+        app_commands.Choice(name="KICK", value="kick"),
+        app_commands.Choice(name="タイムアウト", value="timeout")
+    ])
+    @app_commands.default_permissions(ban_members=True)
+    async def bulk(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        joined_minutes: Optional[int] = None,
+        name_pattern: Optional[str] = None,
+        user_ids: Optional[str] = None,
+        reason: Optional[str] = None,
+        timeout: Optional[int] = 60
+    ):
+        label, permission = BULK_ACTIONS[action]
+        if not getattr(interaction.user.guild_permissions, permission):
+            await interaction.response.send_message(f"{label}の権限が必要です！", ephemeral=True)
+            return
+
+        if not joined_minutes and not name_pattern and not user_ids:
+            await interaction.response.send_message(
+                "joined_minutes、name_pattern、user_idsのいずれかを指定してください。", ephemeral=True
+            )
+            return
+
+        if action == "timeout" and not 1 <= timeout <= 40320:
+            await interaction.response.send_message("タイムアウト時間は1分から28日の間で指定してください。", ephemeral=True)
+            return
+
+        try:
+            # Vetted like a filter rule: it runs on the event loop against every member name
+            pattern = compile_pattern(name_pattern) if name_pattern else None
+        except ValueError as e:
+            await interaction.response.send_message(f"name_patternが正しくありません: {e}", ephemeral=True)
+            return
+
+        explicit_ids = set()
+        for token in re.split(r"[\s,]+", user_ids or ""):
+            if not token:
+                continue
+            if not token.isdigit():
+                await interaction.response.send_message(f"ユーザーIDが正しくありません: {token}", ephemeral=True)
+                return
+            explicit_ids.add(int(token))
+
+        await interaction.response.defer(ephemeral=True)
+
+        guild = interaction.guild
+        targets, skipped = self._bulk_targets(
+            interaction, explicit_ids, joined_minutes, pattern, allow_absent=action == "ban"
+        )
+        if not targets:
+            await interaction.followup.send("対象のメンバーが見つかりませんでした。", ephemeral=True)
+            return
+        if len(targets) > MAX_BULK_TARGETS:
             await interaction.followup.send(
-                f"メッセージを {len(deleted)}件 削除しました。",
+                f"対象が多すぎます ({len(targets)}人)。{MAX_BULK_TARGETS}人以下になるよう条件を絞ってください。",
                 ephemeral=True
             )
+            return
+
+        preview = ", ".join(self._target_name(guild, user_id) for user_id in targets[:20])
+        if len(targets) > 20:
+            preview += f" ...他 {len(targets) - 20}人"
+        embed = discord.Embed(
+            title=f"⚠️ 一括{label}",
+            description=f"{len(targets)}人を{label}します。続行しますか？\n\n{preview}"[:4096],
+            color=discord.Color.red()
+        )
+        if skipped:
+            embed.set_footer(text=f"ロールの順位などにより {skipped}人 を対象外にしました")
+        view = BulkConfirmView(interaction.user.id)
+        status = await interaction.followup.send(embed=embed, view=view, ephemeral=True, wait=True)
+        await view.wait()
+        if not view.value:
+            await status.edit(content="操作をキャンセルしました。", embed=None, view=None)
+            return
+
+        async def report(progress: BulkProgress):
+            await status.edit(content=f"⏳ {label}中... {progress.processed} / {progress.total}")
+
+        await status.edit(content=f"⏳ {label}中... 0 / {len(targets)}", embed=None, view=None)
+        full_reason = f"{reason or '一括処理'} (/bulk by {interaction.user})"
+        expires_at = discord.utils.utcnow().timestamp() + timeout * 60 if action == "timeout" else None
+        ledger = self.bot.storage.ledger
+        # Our own audit log entries may arrive before each request returns; the pool runs at 2 requests/s
+        ledger.expect(guild.id, targets, action, window=60 + len(targets))
+
+        def record(user_id: int, result: str):
+            if result == SUCCESS[action]:
+                ledger.record(
+                    guild.id, user_id, action,
+                    moderator_id=interaction.user.id, reason=full_reason, source='bulk', expires_at=expires_at
+                )
+
+        progress = await bulk_moderate(
+            guild, targets, action,
+            reason=full_reason,
+            timeout=timedelta(minutes=timeout) if action == "timeout" else None,
+            on_progress=report,
+            on_result=record
+        )
+
+        counts = [
+            f"{BULK_RESULT_LABELS[result]}: {progress.count(result)}人"
+            for result in (SUCCESS[action], NOT_FOUND, FAILED)
+            if progress.count(result)
+        ]
+        lines = [f"✅ 一括{label}が完了しました。 ({len(targets)}人中)"] + counts
+        lines.extend(
+            f"⚠️ {self._target_name(guild, user_id)}: {error}"
+            for user_id, error in list(progress.errors.items())[:5]
+        )
+        report_lines = [
+            f"{user_id}\t{self._target_name(guild, user_id)}\t"
+            f"{BULK_RESULT_LABELS[progress.results.get(user_id, FAILED)]}\t{progress.errors.get(user_id, '')}"
+            for user_id in targets
+        ]
+        file = discord.File(
+            io.BytesIO("\n".join(report_lines).encode('utf-8')),
+            filename=f"bulk-{action}-{discord.utils.utcnow():%Y%m%d-%H%M%S}.txt"
+        )
+        await interaction.followup.send("\n".join(lines)[:2000], file=file, ephemeral=True)
+        await status.edit(content=f"✅ {label}: {progress.processed} / {progress.total}")
+
+    def _bulk_targets(
+        self,
+        interaction: discord.Interaction,
+        explicit_ids: Set[int],
+        joined_minutes: Optional[int],
+        pattern: Optional[regex.Pattern],
+        allow_absent: bool
+    ) -> Tuple[List[int], int]:
+        """Resolve /bulk targets, dropping members the invoker or the bot may not act on"""
+        guild = interaction.guild
+        ids = set(explicit_ids)
+        if joined_minutes or pattern:
+            joined_since = discord.utils.utcnow() - timedelta(minutes=joined_minutes) if joined_minutes else None
+            for member in guild.members:
+                if member.bot:
+                    continue
+                if joined_since and not (member.joined_at and member.joined_at >= joined_since):
+                    continue
+                if pattern and not self._name_matches(pattern, member):
+                    continue
+                ids.add(member.id)
+
+        targets, skipped = [], 0
+        for user_id in sorted(ids):
+            member = guild.get_member(user_id)
+            if member is None:
+                # Users who are not in the guild can still be banned by ID
+                if allow_absent:
+                    targets.append(user_id)
+                else:
+                    skipped += 1
+                continue
+            if (
+                member.id in (interaction.user.id, guild.me.id, guild.owner_id)
+                or member.top_role >= guild.me.top_role
+                or (interaction.user.id != guild.owner_id and member.top_role >= interaction.user.top_role)
+            ):
+                skipped += 1
+                continue
+            targets.append(user_id)
+        return targets, skipped
+
+    @staticmethod
+    def _name_matches(pattern: regex.Pattern, member: discord.Member) -> bool:
+        try:
+            return any(
+                name and pattern.search(name, timeout=PATTERN_TIMEOUT)
+                for name in (member.name, member.global_name, member.nick)
+            )
+        except TimeoutError:
+            logger.warning(f'⚠️ /bulk name_pattern timed out on member {member.id}; not targeted')
+            return False
+
+    @staticmethod
+    def _target_name(guild: discord.Guild, user_id: int) -> str:
+        member = guild.get_member(user_id)
+        return f"{member.name} ({user_id})" if member else str(user_id)
+
+    @staticmethod
+    async def _finish_status(interaction: discord.Interaction, status: discord.WebhookMessage, content: str):
+        """Show a final result in the status message, or in the channel once it can no longer be edited"""
+        try:
+            await status.edit(content=content)
+            return
+        except discord.HTTPException as e:
+            # The followup token expires 15 minutes after the command; long purges outlive it
+            logger.info(f'Status message for {interaction.command.name} is no longer editable: {e}')
+        try:
+            await interaction.channel.send(
+                f"{interaction.user.mention} {content}"[:2000],
+                allowed_mentions=discord.AllowedMentions(users=[interaction.user])
+            )
+        except discord.HTTPException as e:
+            logger.warning(f'⚠️ Failed to post {interaction.command.name} result in {interaction.channel.id}: {e}')
+
+    @staticmethod
+    def _purge_status(progress: PurgeProgress) -> str:
+        return (
+            f"🧹 削除中... 確認 {progress.scanned}件 / 削除 {progress.deleted}件 "
+            f"(一括 {progress.bulk_deleted} / 個別 {progress.single_deleted})"
+        )
 
     @app_commands.command(name="nuke", description="チャンネルのメッセージをすべて削除")
     @app_commands.default_permissions(administrator=True)
@@ -126,18 +473,24 @@ class ModerationCommands(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="list", description="BANまたはKICKされたユーザーの一覧を表示")
-    @app_commands.describe(type="表示する一覧の種類")
+    @app_commands.describe(
+        type="表示する一覧の種類",
+        query="BAN一覧: ユーザーIDまたは名前の先頭で検索 / 履歴: ユーザーIDで絞り込み"
+    )
     @app_commands.choices(type=[
         app_commands.Choice(name="BAN一覧", value="ban"),
-        app_commands.Choice(name="KICK一覧", value="kick")
+        app_commands.Choice(name="BAN履歴", value="ban_history"),
+        app_commands.Choice(name="KICK一覧", value="kick"),
+        app_commands.Choice(name="タイムアウト履歴", value="timeout")
     ])
     @app_commands.default_permissions(ban_members=True, kick_members=True)
     async def list_users(
         self,
         interaction: discord.Interaction,
-        type: str
+        type: str,
+        query: Optional[str] = None
     ):
-        if type == "ban" and not interaction.user.guild_permissions.ban_members:
+        if type in ("ban", "ban_history") and not interaction.user.guild_permissions.ban_members:
             await interaction.response.send_message("BANの権限が必要です！", ephemeral=True)
             return
             
@@ -145,56 +498,52 @@ class ModerationCommands(commands.Cog):
             await interaction.response.send_message("KICKの権限が必要です！", ephemeral=True)
             return
 
+        if type == "timeout" and not interaction.user.guild_permissions.moderate_members:
+            await interaction.response.send_message("タイムアウトの権限が必要です！", ephemeral=True)
+            return
+
         await interaction.response.defer(ephemeral=True)
 
         if type == "ban":
-            bans = [entry async for entry in interaction.guild.bans()]
-            if not bans:
-                await interaction.followup.send("BANされているユーザーはいません。", ephemeral=True)
-                return
-
-            embed = discord.Embed(
-                title="BANされているユーザー",
-                color=discord.Color.red()
-            )
-            
-            for ban in bans:
+            if query and query.isdigit():
+                # An ID lookup is a single request, no paging needed
+                try:
+                    ban = await interaction.guild.fetch_ban(discord.Object(id=int(query)))
+                except discord.NotFound:
+                    await interaction.followup.send("このユーザーはBANされていません。", ephemeral=True)
+                    return
+                embed = discord.Embed(title="BANされているユーザー", color=discord.Color.red())
                 embed.add_field(
                     name=f"{ban.user.name} ({ban.user.id})",
                     value=f"理由: {ban.reason or '理由なし'}",
                     inline=False
                 )
-
-        elif type == "kick":
-            # KICKの履歴はDiscord APIで直接は取得できないため、
-            # 監査ログから最近のKICKを取得
-            kicks = []
-            async for entry in interaction.guild.audit_logs(action=discord.AuditLogAction.kick):
-                if len(kicks) >= 25:  # 最大25件まで
-                    break
-                kicks.append(entry)
-
-            if not kicks:
-                await interaction.followup.send("最近KICKされたユーザーはいません。", ephemeral=True)
+                await interaction.followup.send(embed=embed, ephemeral=True)
                 return
 
-            embed = discord.Embed(
-                title="最近KICKされたユーザー",
-                color=discord.Color.orange()
-            )
-            
-            for kick in kicks:
-                embed.add_field(
-                    name=f"{kick.target} ({kick.target.id})",
-                    value=(
-                        f"実行者: {kick.user.name}\n"
-                        f"日時: {discord.utils.format_dt(kick.created_at)}\n"
-                        f"理由: {kick.reason or '理由なし'}"
-                    ),
-                    inline=False
-                )
+            view = BanListView(BanPager(interaction.guild, prefix=query), interaction.user.id)
+            embed = await view.render()
+            if view.pager.exhausted and view.pager.known_pages == 0 and not query:
+                await interaction.followup.send("BANされているユーザーはいません。", ephemeral=True)
+                return
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            return
 
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        # History comes from the local ledger, which keeps more than the audit log and needs no REST scan
+        if query and not query.isdigit():
+            await interaction.followup.send("履歴はユーザーIDで絞り込んでください。", ephemeral=True)
+            return
+        action = "ban" if type == "ban_history" else type
+        pager = LedgerPager(
+            self.bot.storage.ledger, interaction.guild.id, action, int(query) if query else None
+        )
+        view = LedgerListView(pager, interaction.user.id)
+        embed = await view.render()
+        if pager.exhausted and pager.known_pages == 0 and not query:
+            empty = {"kick": "KICKされたユーザーの記録はありません。", "timeout": "タイムアウトの記録はありません。"}
+            await interaction.followup.send(empty.get(action, "BANの記録はありません。"), ephemeral=True)
+            return
+        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(ModerationCommands(bot))
@@ -36,8 +36,10 @@ class RolePanelView(View):
 class RolePanelCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.panels: Dict[str, Dict] = {}
-        self.selected_panel: Optional[str] = None
+        self.guild_states = bot.storage.cache(
+            'rolepanel',
+            lambda: {'panels': {}, 'selected_panel': None}
+        )
 
     @app_commands.command(name="rolepanel", description="ロールパネルを管理")
     @app_commands.describe(
@@ -60,13 +62,16 @@ class RolePanelCommands(commands.Cog):
             await interaction.response.send_message("このコマンドは管理者のみ使用できます。", ephemeral=True)
             return
 
+        state = await self.guild_states.load(interaction.guild.id)
+        panels = state['panels']
+
         if action == "create":
             if not all([role, emoji]):
                 await interaction.response.send_message("ロールと絵文字を指定してください。", ephemeral=True)
                 return
 
-            panel_id = str(len(self.panels) + 1)
-            self.panels[panel_id] = {
+            panel_id = str(len(panels) + 1)
+            panels[panel_id] = {
                 'roles': [{
                     'id': role.id,
                     'emoji': emoji
@@ -75,13 +80,13 @@ class RolePanelCommands(commands.Cog):
                 'title': title or "ロール選択",
                 'message_id': None
             }
-            self.selected_panel = panel_id
+            state['selected_panel'] = panel_id
             
-            await self._update_panel(interaction)
+            await self._update_panel(interaction, state)
             await interaction.response.send_message("ロールパネルを作成しました。", ephemeral=True)
 
         elif action == "add":
-            if not self.selected_panel:
+            if not state['selected_panel']:
                 await interaction.response.send_message("パネルが選択されていません。", ephemeral=True)
                 return
 
@@ -89,91 +94,93 @@ class RolePanelCommands(commands.Cog):
                 await interaction.response.send_message("ロールと絵文字を指定してください。", ephemeral=True)
                 return
 
-            panel = self.panels[self.selected_panel]
+            panel = panels[state['selected_panel']]
             panel['roles'].append({
                 'id': role.id,
                 'emoji': emoji
             })
             
-            await self._update_panel(interaction)
+            await self._update_panel(interaction, state)
             await interaction.response.send_message("ロールを追加しました。", ephemeral=True)
 
         elif action == "edit":
-            if not self.selected_panel:
+            if not state['selected_panel']:
                 await interaction.response.send_message("パネルが選択されていません。", ephemeral=True)
                 return
 
-            panel = self.panels[self.selected_panel]
+            panel = panels[state['selected_panel']]
             if color:
                 panel['color'] = int(color.lstrip('#'), 16)
             if title:
                 panel['title'] = title
             
-            await self._update_panel(interaction)
+            await self._update_panel(interaction, state)
             await interaction.response.send_message("パネルを更新しました。", ephemeral=True)
 
         elif action == "remove":
-            if not self.selected_panel or not role:
+            if not state['selected_panel'] or not role:
                 await interaction.response.send_message("パネルとロールを指定してください。", ephemeral=True)
                 return
 
-            panel = self.panels[self.selected_panel]
+            panel = panels[state['selected_panel']]
             panel['roles'] = [r for r in panel['roles'] if r['id'] != role.id]
             
-            await self._update_panel(interaction)
+            await self._update_panel(interaction, state)
             await interaction.response.send_message("ロールを削除しました。", ephemeral=True)
 
         elif action == "copy":
-            if not self.selected_panel:
+            if not state['selected_panel']:
                 await interaction.response.send_message("パネルが選択されていません。", ephemeral=True)
                 return
 
-            panel_id = str(len(self.panels) + 1)
-            self.panels[panel_id] = self.panels[self.selected_panel].copy()
-            self.panels[panel_id]['message_id'] = None
-            self.selected_panel = panel_id
+            panel_id = str(len(panels) + 1)
+            panels[panel_id] = panels[state['selected_panel']].copy()
+            panels[panel_id]['message_id'] = None
+            state['selected_panel'] = panel_id
+            self.guild_states.mark_dirty(interaction.guild.id)
             
             await interaction.response.send_message("パネルをコピーしました。", ephemeral=True)
 
         elif action == "delete":
-            if not self.selected_panel:
+            if not state['selected_panel']:
                 await interaction.response.send_message("パネルが選択されていません。", ephemeral=True)
                 return
 
-            del self.panels[self.selected_panel]
-            self.selected_panel = None
+            del panels[state['selected_panel']]
+            state['selected_panel'] = None
+            self.guild_states.mark_dirty(interaction.guild.id)
             await interaction.response.send_message("パネルを削除しました。", ephemeral=True)
 
         elif action == "selected":
-            if not self.selected_panel:
+            if not state['selected_panel']:
                 await interaction.response.send_message("パネルが選択されていません。", ephemeral=True)
                 return
 
-            panel = self.panels[self.selected_panel]
+            panel = panels[state['selected_panel']]
             if panel['message_id']:
                 await interaction.response.send_message(f"現在のパネル: {panel['message_id']}", ephemeral=True)
             else:
                 await interaction.response.send_message("パネルはまだ設置されていません。", ephemeral=True)
 
         elif action == "refresh":
-            if not self.selected_panel:
+            if not state['selected_panel']:
                 await interaction.response.send_message("パネルが選択されていません。", ephemeral=True)
                 return
             
-            await self._update_panel(interaction)
+            await self._update_panel(interaction, state)
             await interaction.response.send_message("パネルを更新しました。", ephemeral=True)
 
         elif action == "autoremove":
-            if not self.selected_panel:
+            if not state['selected_panel']:
                 await interaction.response.send_message("パネルが選択されていません。", ephemeral=True)
                 return
 
-            panel = self.panels[self.selected_panel]
+            panel = panels[state['selected_panel']]
             original_count = len(panel['roles'])
             panel['roles'] = [r for r in panel['roles'] if interaction.guild.get_role(r['id'])]
             removed_count = original_count - len(panel['roles'])
             
-            await self._update_panel(interaction)
+            await self._update_panel(interaction, state)
             await interaction.response.send_message(f"{removed_count}個の削除されたロールを除去しました。", ephemeral=True)
 
         elif action == "debug":
@@ -191,8 +198,8 @@ class RolePanelCommands(commands.Cog):
             
             await interaction.response.send_message("\n".join(debug_info), ephemeral=True)
 
-    async def _update_panel(self, interaction: discord.Interaction):
-        panel = self.panels[self.selected_panel]
+    async def _update_panel(self, interaction: discord.Interaction, state: Dict):
+        panel = state['panels'][state['selected_panel']]
         
         embed = discord.Embed(
             title=panel['title'],
@@ -224,5 +231,7 @@ class RolePanelCommands(commands.Cog):
             message = await interaction.channel.send(embed=embed, view=view)
             panel['message_id'] = message.id
 
+        self.guild_states.mark_dirty(interaction.guild.id)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(RolePanelCommands(bot))
@@ -35,13 +35,32 @@ class StatsCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.stat_tasks: Dict[int, asyncio.Task] = {}
-        self.stat_channels: Dict[int, Dict] = {}
+        self.stat_channels = bot.storage.cache('stats', dict)  # guild_id -> channel_id -> settings
 
     def cog_unload(self):
         # Cancel all running tasks when the cog is unloaded
         for task in self.stat_tasks.values():
             task.cancel()
 
+    def _start_task(self, channel: discord.VoiceChannel, settings: Dict):
+        type_ = settings['type']
+        if type_ == "time":
+            coro = self.update_time_channel(channel, settings['timezone'])
+        elif type_ == "day":
+            coro = self.update_date_channel(channel, settings['timezone'])
+        else:
+            coro = self.update_member_count(channel, channel.guild, type_)
+        self.stat_tasks[channel.id] = self.bot.loop.create_task(coro)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        # 再起動後に保存済みの統計チャンネルの更新を再開
+        channels = await self.stat_channels.load(guild.id)
+        for channel_id, settings in channels.items():
+            channel = guild.get_channel(int(channel_id))
+            if channel and channel.id not in self.stat_tasks:
+                self._start_task(channel, settings)
+
     async def update_time_channel(self, channel: discord.VoiceChannel, timezone_str: str):
         try:
             while True:
@@ -127,14 +146,11 @@ class StatsCommands(commands.Cog):
                     )
 
                 channel = await category.create_voice_channel(f"Loading...")
-
-                if type == "time":
-                    task = self.bot.loop.create_task(self.update_time_channel(channel, tz_str))
-                else:
-                    task = self.bot.loop.create_task(self.update_date_channel(channel, tz_str))
-
-                self.stat_tasks[channel.id] = task
-                self.stat_channels[channel.id] = {"type": type, "timezone": tz_str}
+                settings = {"type": type, "timezone": tz_str}
+                self._start_task(channel, settings)
+                channels = await self.stat_channels.load(interaction.guild.id)
+                channels[str(channel.id)] = settings
+                self.stat_channels.mark_dirty(interaction.guild.id)
 
             elif type in ["online_member", "offline_member", "member"]:
                 category = discord.utils.get(interaction.guild.categories, name="Server Stats")
@@ -147,11 +163,11 @@ class StatsCommands(commands.Cog):
                     )
 
                 channel = await category.create_voice_channel(f"Loading...")
-                task = self.bot.loop.create_task(
-                    self.update_member_count(channel, interaction.guild, type)
-                )
-                self.stat_tasks[channel.id] = task
-                self.stat_channels[channel.id] = {"type": type}
+                settings = {"type": type}
+                self._start_task(channel, settings)
+                channels = await self.stat_channels.load(interaction.guild.id)
+                channels[str(channel.id)] = settings
+                self.stat_channels.mark_dirty(interaction.guild.id)
 
             await interaction.response.send_message("統計チャンネルを作成しました。", ephemeral=True)
         except Exception as e:
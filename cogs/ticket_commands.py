@@ -2,13 +2,15 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ui import Button, View
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
+import re
 
 class TicketButton(Button):
-    def __init__(self, panel_name: str, ticket_data: Dict):
+    def __init__(self, panel_name: str, ticket_data: Dict, save: Callable[[], None]):
         super().__init__(label="チケットを作成", style=discord.ButtonStyle.primary)
         self.panel_name = panel_name
         self.ticket_data = ticket_data
+        self.save = save
 
     async def callback(self, interaction: discord.Interaction):
         try:
@@ -59,6 +61,7 @@ class TicketButton(Button):
                     if user_id in self.ticket_data['user_tickets']:
                         if channel.id in self.ticket_data['user_tickets'][user_id]:
                             self.ticket_data['user_tickets'][user_id].remove(channel.id)
+                            self.save()
                 else:
                     await inter.response.send_message("このボタンを使用する権限がありません。", ephemeral=True)
 
@@ -76,6 +79,7 @@ class TicketButton(Button):
             if user_id not in self.ticket_data['user_tickets']:
                 self.ticket_data['user_tickets'][user_id] = []
             self.ticket_data['user_tickets'][user_id].append(channel.id)
+            self.save()
 
             await interaction.response.send_message(f"チケットを作成しました: {channel.mention}", ephemeral=True)
         except Exception as e:
@@ -84,11 +88,11 @@ class TicketButton(Button):
 class TicketCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.ticket_data = {
+        self.ticket_data = bot.storage.cache('ticket', lambda: {
             'panels': {},
             'user_tickets': {},
             'ticket_count': 0
-        }
+        })
 
     @app_commands.command(name="ticket-create", description="Create a ticket panel")
     @app_commands.default_permissions(administrator=True)
@@ -97,17 +101,19 @@ class TicketCommands(commands.Cog):
         interaction: discord.Interaction,
         panel_name: str
     ):
-        if panel_name in self.ticket_data['panels']:
+        ticket_data = await self.ticket_data.load(interaction.guild.id)
+        if panel_name in ticket_data['panels']:
             await interaction.response.send_message("同名のパネルが既に存在します。", ephemeral=True)
             return
 
-        self.ticket_data['panels'][panel_name] = {
+        ticket_data['panels'][panel_name] = {
             'embed_color': 0x00ff00,
             'description': "下のボタンをクリックしてチケットを作成",
             'title': "サポートチケット",
             'image': None,
             'admin_role': None
         }
+        self.ticket_data.mark_dirty(interaction.guild.id)
         
         await interaction.response.send_message(f"チケットパネル '{panel_name}' を作成しました！", ephemeral=True)
 
@@ -118,11 +124,12 @@ class TicketCommands(commands.Cog):
         interaction: discord.Interaction,
         panel_name: str
     ):
-        if panel_name not in self.ticket_data['panels']:
+        ticket_data = await self.ticket_data.load(interaction.guild.id)
+        if panel_name not in ticket_data['panels']:
             await interaction.response.send_message("パネルが見つかりません。", ephemeral=True)
             return
 
-        panel = self.ticket_data['panels'][panel_name]
+        panel = ticket_data['panels'][panel_name]
         if not panel['admin_role']:
             await interaction.response.send_message("管理者ロールが設定されていません。", ephemeral=True)
             return
@@ -136,7 +143,8 @@ class TicketCommands(commands.Cog):
             embed.set_image(url=panel['image'])
 
         view = View(timeout=None)
-        view.add_item(TicketButton(panel_name, self.ticket_data))
+        guild_id = interaction.guild.id
+        view.add_item(TicketButton(panel_name, ticket_data, lambda: self.ticket_data.mark_dirty(guild_id)))
         
         await interaction.channel.send(embed=embed, view=view)
         await interaction.response.send_message("チケットパネルを設置しました！", ephemeral=True)
@@ -153,11 +161,12 @@ class TicketCommands(commands.Cog):
         title: Optional[str] = None,
         admin_role: Optional[discord.Role] = None
     ):
-        if panel_name not in self.ticket_data['panels']:
+        ticket_data = await self.ticket_data.load(interaction.guild.id)
+        if panel_name not in ticket_data['panels']:
             await interaction.response.send_message("パネルが見つかりません。", ephemeral=True)
             return
 
-        panel = self.ticket_data['panels'][panel_name]
+        panel = ticket_data['panels'][panel_name]
         
         if embed_color:
             if not re.match(r'^#(?:[0-9a-fA-F]{3}){1,2}$', embed_color):
@@ -177,6 +186,7 @@ class TicketCommands(commands.Cog):
         if admin_role:
             panel['admin_role'] = admin_role.id
 
+        self.ticket_data.mark_dirty(interaction.guild.id)
         await interaction.response.send_message(f"パネル '{panel_name}' の設定を更新しました！", ephemeral=True)
 
 async def setup(bot: commands.Bot):
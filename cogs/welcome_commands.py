@@ -7,8 +7,8 @@ import re
 class WelcomeCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.welcome_settings: Dict[str, Dict] = {}
-        self.dm_settings: Dict[str, Dict] = {}
+        # guild_id -> {'welcome': channel message settings, 'dm': DM settings}
+        self.guild_settings = bot.storage.cache('welcome', lambda: {'welcome': None, 'dm': None})
 
     def parse_placeholders(self, message: str, member: discord.Member, invite=None) -> str:
         replacements = {
@@ -54,7 +54,7 @@ class WelcomeCommands(commands.Cog):
         embed: Optional[bool] = True,
         color: Optional[str] = "#5865F2"
     ):
-        guild_id = str(interaction.guild.id)
+        settings = await self.guild_settings.load(interaction.guild.id)
 
         if action == "set":
             if not channel:
@@ -67,12 +67,13 @@ class WelcomeCommands(commands.Cog):
                 "メンバー数: [@member.count]人"
             )
 
-            self.welcome_settings[guild_id] = {
+            settings['welcome'] = {
                 'channel_id': channel.id,
                 'message': message or default_message,
                 'embed': embed,
                 'color': int(color.lstrip('#'), 16) if color else 0x5865F2
             }
+            self.guild_settings.mark_dirty(interaction.guild.id)
 
             # プレビューを表示
             preview = self.parse_placeholders(
@@ -101,8 +102,9 @@ class WelcomeCommands(commands.Cog):
                 await interaction.response.send_message("チャンネルを指定してください！", ephemeral=True)
                 return
 
-            if guild_id in self.welcome_settings:
-                del self.welcome_settings[guild_id]
+            if settings['welcome']:
+                settings['welcome'] = None
+                self.guild_settings.mark_dirty(interaction.guild.id)
                 await interaction.response.send_message(
                     f"{channel.mention} の参加メッセージを削除しました。",
                     ephemeral=True
@@ -122,11 +124,12 @@ class WelcomeCommands(commands.Cog):
                 "招待者: [@invite.url.user]"
             )
 
-            self.dm_settings[guild_id] = {
+            settings['dm'] = {
                 'message': message or default_dm,
                 'embed': embed,
                 'color': int(color.lstrip('#'), 16) if color else 0x5865F2
             }
+            self.guild_settings.mark_dirty(interaction.guild.id)
 
             # プレビューを表示
             preview = self.parse_placeholders(
@@ -151,8 +154,9 @@ class WelcomeCommands(commands.Cog):
                 )
 
         elif action == "dm_unset":
-            if guild_id in self.dm_settings:
-                del self.dm_settings[guild_id]
+            if settings['dm']:
+                settings['dm'] = None
+                self.guild_settings.mark_dirty(interaction.guild.id)
                 await interaction.response.send_message(
                     "DM参加メッセージを削除しました。",
                     ephemeral=True
@@ -165,11 +169,11 @@ class WelcomeCommands(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        guild_id = str(member.guild.id)
+        guild_settings = await self.guild_settings.load(member.guild.id)
 
         # チャンネルメッセージ
-        if guild_id in self.welcome_settings:
-            settings = self.welcome_settings[guild_id]
+        if guild_settings['welcome']:
+            settings = guild_settings['welcome']
             channel = member.guild.get_channel(settings['channel_id'])
             
             if channel:
@@ -185,8 +189,8 @@ class WelcomeCommands(commands.Cog):
                     await channel.send(message)
 
         # DMメッセージ
-        if guild_id in self.dm_settings:
-            settings = self.dm_settings[guild_id]
+        if guild_settings['dm']:
+            settings = guild_settings['dm']
             message = self.parse_placeholders(settings['message'], member)
             
             try:
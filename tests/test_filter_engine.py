@@ -0,0 +1,164 @@
+import unittest
+from unittest import mock
+
+from utils.filter_engine import (
+    CLEAN, INVITE, URL, WORD,
+    GuildFilter, MessageDetector, PatternMatcher, WordMatcher, compile_pattern, compile_rule, normalize
+)
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_folds_width_case_and_invisible_characters(self):
+        self.assertEqual(normalize('ＢＡＤ'), 'bad')
+        self.assertEqual(normalize('b​ad'), 'bad')
+
+    def test_collapses_spaced_and_separated_runs(self):
+        self.assertEqual(normalize('b a d'), 'bad')
+        self.assertEqual(normalize('b-a-d!'), 'bad!')
+
+    def test_folds_leet_inside_words_only(self):
+        self.assertEqual(normalize('b4d'), 'bad')
+        self.assertEqual(normalize('version 5.3.x'), 'version 53x')
+
+    def test_keeps_spaces_between_words(self):
+        self.assertEqual(normalize('class example'), 'class example')
+
+
+class WordMatcherTest(unittest.TestCase):
+    def test_finds_word_and_offset(self):
+        matcher = WordMatcher(['spam', 'bad'])
+        self.assertEqual(matcher.search(normalize('so bad')), ('bad', 3))
+
+    def test_earlier_registered_word_wins(self):
+        matcher = WordMatcher(['spam', 'bad'])
+        self.assertEqual(matcher.search(normalize('so bad and spam')), ('spam', 11))
+
+    def test_skips_blank_and_duplicate_words(self):
+        self.assertEqual(len(WordMatcher(['bad', 'BAD', '  ', ''])), 1)
+
+    def test_no_match(self):
+        self.assertIsNone(WordMatcher(['bad']).search('all good'))
+
+
+class CompileRuleTest(unittest.TestCase):
+    def assertRejected(self, rule_type, text):
+        with self.assertRaises(ValueError):
+            compile_rule(rule_type, text)
+
+    def test_translates_rules(self):
+        self.assertEqual(compile_rule('wildcard', 'sp*m'), r'sp\w*m')
+        self.assertEqual(compile_rule('wildcard', 'b?d'), r'b\wd')
+        self.assertEqual(compile_rule('word', 'bad'), r'\bbad\b')
+        self.assertEqual(compile_rule('regex', r'f[o0]+'), r'f[o0]+')
+
+    def test_rejects_rules_matching_the_empty_string(self):
+        for rule_type, text in [('wildcard', '*'), ('wildcard', '**'), ('regex', 'x?'), ('regex', 'a*'),
+                                ('regex', '|foo'), ('regex', '(?:)'), ('regex', '(a|a)*$')]:
+            with self.subTest(text=text):
+                self.assertRejected(rule_type, text)
+
+    def test_rejects_blank_rules(self):
+        for rule_type in ('word', 'wildcard', 'regex'):
+            with self.subTest(rule_type=rule_type):
+                self.assertRejected(rule_type, '  ')
+
+    def test_rejects_constructs_that_break_the_combined_pattern(self):
+        for text in [r'(a)\1', '(?P<name>a)', '(?<name>a)', '(?P=name)', '(?R)', '(?1)', '(?(1)a|b)',
+                     '(?i)foo', '(?x)a b', '(?V1)a']:
+            with self.subTest(text=text):
+                self.assertRejected('regex', text)
+
+    def test_allows_escaped_lookalikes(self):
+        self.assertEqual(compile_rule('regex', r'\\1'), r'\\1')
+        self.assertEqual(compile_rule('regex', '(?i:abc)'), '(?i:abc)')
+
+    def test_rejects_invalid_and_long_rules(self):
+        self.assertRejected('regex', '(')
+        self.assertRejected('regex', 'a' * 201)
+        self.assertRejected('glob', 'a')
+
+    def test_rejects_rules_that_backtrack_catastrophically(self):
+        for text in ['(a|aa)+$', '(a|a)+$', '(a+)+$', r'(\w+\s?)+$', '(.*a){12}$']:
+            with self.subTest(text=text):
+                self.assertRejected('regex', text)
+
+    def test_accepts_rules_that_are_fast_on_the_engine(self):
+        for text in ['(cat|cats)+', 'a*a*a*b', r'\bhttps?://\S+']:
+            with self.subTest(text=text):
+                compile_rule('regex', text)
+
+
+class CompilePatternTest(unittest.TestCase):
+    def test_compiles_case_insensitively(self):
+        self.assertIsNotNone(compile_pattern(r'^raid\d+').search('RAID42'))
+
+    def test_vets_like_a_rule(self):
+        for text in ['(a+)+$', '.*', '(']:
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                compile_pattern(text)
+
+
+class PatternMatcherTest(unittest.TestCase):
+    def test_reports_leftmost_rule(self):
+        matcher = PatternMatcher([('sp*m', 'wildcard'), ('bad', 'word')])
+        self.assertEqual(matcher.search('bad spaaam'), ('bad', 0))
+        self.assertEqual(matcher.search('so spaaam'), ('sp*m', 3))
+        self.assertIsNone(matcher.search('badge'))
+
+    def test_skips_rules_that_no_longer_pass(self):
+        matcher = PatternMatcher([('*', 'wildcard'), ('x?', 'regex'), ('  ', 'word'), ('foo', 'word')])
+        self.assertEqual(len(matcher), 1)
+        self.assertIsNone(matcher.search('an ordinary message'))
+
+    def test_ignores_zero_length_matches(self):
+        matcher = PatternMatcher([(r'\b', 'regex'), ('foo', 'word')])
+        self.assertIsNone(matcher.search('hello there'))
+        self.assertEqual(matcher.search('a foo b'), ('foo', 2))
+
+    def test_search_gives_up_after_the_timeout(self):
+        # Stored before the timing probes existed; rebuilds only repeat the cheap checks
+        matcher = PatternMatcher([('(a|aa)+$', 'regex')])
+        with self.assertLogs('discord', 'WARNING'):
+            self.assertIsNone(matcher.search('a' * 40 + '!'))
+
+
+class MessageDetectorTest(unittest.TestCase):
+    def test_word_hit_points_into_the_raw_message(self):
+        detector = MessageDetector(WordMatcher(['bad']))
+        content = 'well, b-a-d!'
+        detection = detector.classify(content)
+        self.assertEqual((detection.kind, detection.word), (WORD, 'bad'))
+        self.assertEqual(content[detection.start], 'b')
+
+    def test_words_do_not_match_across_spaces(self):
+        detector = MessageDetector(WordMatcher(['sex']))
+        self.assertEqual(detector.classify('version 5.3.x is out').kind, CLEAN)
+
+    def test_links(self):
+        detector = MessageDetector(WordMatcher([]), block_urls=True, block_invites=True)
+        self.assertEqual(detector.classify('see https://example.com').kind, URL)
+        self.assertEqual(detector.classify('join discord.gg/abc').kind, INVITE)
+        self.assertEqual(detector.classify('just text').kind, CLEAN)
+
+    def test_invites_only(self):
+        detector = MessageDetector(WordMatcher([]), block_invites=True)
+        self.assertEqual(detector.classify('see https://example.com').kind, CLEAN)
+        self.assertEqual(detector.classify('https://discord.gg/abc').kind, INVITE)
+
+    def test_unconfigured_detector_skips_normalization(self):
+        detector = MessageDetector(WordMatcher([]))
+        with mock.patch('utils.filter_engine._nfkc_lower') as nfkc_lower:
+            self.assertEqual(detector.classify('https://discord.gg/abc ｂａｄ').kind, CLEAN)
+        nfkc_lower.assert_not_called()
+
+    def test_guild_filter_round_trip(self):
+        guild_filter = GuildFilter.from_dict({
+            'filtered_words': {'bad': {'penalty': 'kick'}, 'sp*m': {'penalty': 'ban', 'type': 'wildcard'}},
+        })
+        restored = GuildFilter.from_dict(guild_filter.to_dict())
+        self.assertEqual(restored.detector.classify('spam!').word, 'sp*m')
+        self.assertEqual(restored.detector.classify('so BAD').word, 'bad')
+
+
+if __name__ == '__main__':
+    unittest.main()
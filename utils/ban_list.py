@@ -0,0 +1,71 @@
+from typing import List, Optional
+
+import discord
+
+from utils.paging import CachedPager, PagedView
+
+PAGE_SIZE = 10
+SEARCH_BATCH = 1000  # bans per request while scanning for a name prefix
+
+
+class BanPager(CachedPager[discord.BanEntry]):
+    """Fetches a guild's bans one page at a time and keeps the pages it has seen.
+
+    Bans are paged with the API's ``after`` cursor (user IDs ascending), so
+    only the pages actually viewed are requested. With a name ``prefix`` the
+    pager scans in large batches and keeps only the matching entries.
+    """
+
+    def __init__(self, guild: discord.Guild, prefix: Optional[str] = None, page_size: int = PAGE_SIZE):
+        super().__init__()
+        self.guild = guild
+        self.prefix = prefix.lower() if prefix else None
+        self.page_size = page_size
+        self._cursor: Optional[int] = None
+        self._buffer: List[discord.BanEntry] = []
+
+    def _matches(self, entry: discord.BanEntry) -> bool:
+        if self.prefix is None:
+            return True
+        user = entry.user
+        return user.name.lower().startswith(self.prefix) or (
+            user.global_name is not None and user.global_name.lower().startswith(self.prefix)
+        )
+
+    async def _fill_page(self):
+        batch_size = self.page_size if self.prefix is None else SEARCH_BATCH
+        while len(self._buffer) < self.page_size and not self.exhausted:
+            options = {'limit': batch_size}
+            if self._cursor is not None:
+                options['after'] = discord.Object(id=self._cursor)
+            batch = [entry async for entry in self.guild.bans(**options)]
+            if batch:
+                self._cursor = batch[-1].user.id
+            if len(batch) < batch_size:
+                self.exhausted = True
+            self._buffer.extend(entry for entry in batch if self._matches(entry))
+
+        if self._buffer:
+            self.pages.append(self._buffer[:self.page_size])
+            del self._buffer[:self.page_size]
+
+
+class BanListView(PagedView):
+    """Ban list pages with prev/next buttons"""
+
+    pager: BanPager
+
+    def build_embed(self, entries: List[discord.BanEntry]) -> discord.Embed:
+        title = "BANされているユーザー"
+        if self.pager.prefix:
+            title += f" (検索: {self.pager.prefix})"
+        embed = discord.Embed(title=title, color=discord.Color.red())
+        for ban in entries:
+            embed.add_field(
+                name=f"{ban.user.name} ({ban.user.id})",
+                value=f"理由: {ban.reason or '理由なし'}"[:1024],
+                inline=False
+            )
+        if not entries:
+            embed.description = "該当するユーザーはいません。"
+        return embed
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+from utils.members import resolve_member
+from utils.paging import OwnerView
+
+logger = logging.getLogger('discord')
+
+BULK_BAN_CHUNK = 200  # users per bulk ban request, the API maximum
+
+# Per-target outcomes
+BANNED, KICKED, TIMED_OUT, NOT_FOUND, FAILED = 'banned', 'kicked', 'timed_out', 'not_found', 'failed'
+SUCCESS = {'ban': BANNED, 'kick': KICKED, 'timeout': TIMED_OUT}
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second with bursts of up to ``capacity``"""
+
+    __slots__ = ('rate', 'capacity', '_tokens', '_updated', '_lock')
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # The lock queues waiters so tokens are handed out in arrival order
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BulkProgress:
+    """Per-target results and running counters for one bulk action"""
+
+    __slots__ = ('action', 'total', 'results', 'errors', 'done')
+
+    def __init__(self, action: str, total: int):
+        self.action = action
+        self.total = total
+        self.results: Dict[int, str] = {}
+        self.errors: Dict[int, str] = {}
+        self.done = False
+
+    @property
+    def processed(self) -> int:
+        return len(self.results)
+
+    def count(self, result: str) -> int:
+        return sum(1 for value in self.results.values() if value == result)
+
+    def set(self, user_id: int, result: str, error: Optional[Exception] = None):
+        self.results[user_id] = result
+        if error is not None:
+            self.errors[user_id] = str(error)[:200]
+
+
+ProgressCallback = Callable[[BulkProgress], Awaitable[None]]
+ResultCallback = Callable[[int, str], None]
+
+
+async def bulk_moderate(
+    guild: discord.Guild,
+    user_ids: List[int],
+    action: str,
+    *,
+    reason: Optional[str] = None,
+    timeout: Optional[timedelta] = None,
+    concurrency: int = 4,
+    rate: float = 2.0,
+    burst: int = 5,
+    on_progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 2.0,
+    on_result: Optional[ResultCallback] = None
+) -> BulkProgress:
+    """Ban, kick or time out every user in ``user_ids``.
+
+    Bans go through the bulk ban endpoint in chunks of 200, so even a large
+    raid is a handful of requests. Kicks and timeouts, and any ban chunk the
+    bulk endpoint rejects, run on ``concurrency`` workers sharing a token
+    bucket of ``rate`` requests per second, which keeps the pool under the
+    per-guild member rate limit instead of bouncing off 429s.
+    ``on_progress`` is called at most every ``progress_interval`` seconds and
+    once at the end; ``on_result`` is called as soon as each target settles.
+    """
+    progress = BulkProgress(action, len(user_ids))
+    bucket = TokenBucket(rate, burst)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def settle(user_id: int, result: str, error: Optional[Exception] = None):
+        progress.set(user_id, result, error)
+        if on_result is not None:
+            on_result(user_id, result)
+
+    async def apply(user_id: int):
+        await bucket.acquire()
+        try:
+            if action == 'ban':
+                await guild.ban(discord.Object(id=user_id), reason=reason, delete_message_seconds=0)
+            elif action == 'kick':
+                await guild.kick(discord.Object(id=user_id), reason=reason)
+            else:
+                member = await resolve_member(guild, user_id)
+                if member is None:
+                    settle(user_id, NOT_FOUND)
+                    return
+                await member.timeout(timeout, reason=reason)
+            settle(user_id, SUCCESS[action])
+        except discord.NotFound:
+            settle(user_id, NOT_FOUND)
+        except discord.HTTPException as e:
+            settle(user_id, FAILED, e)
+
+    async def worker():
+        while True:
+            user_id = await queue.get()
+            if user_id is None:
+                return
+            await apply(user_id)
+
+    async def bulk_ban(chunk: List[int]):
+        try:
+            result = await guild.bulk_ban(
+                [discord.Object(id=user_id) for user_id in chunk], reason=reason, delete_message_seconds=0
+            )
+        except discord.HTTPException as e:
+            # The whole chunk was rejected; retry it one by one on the paced pool
+            logger.warning(f'⚠️ Bulk ban of {len(chunk)} users in {guild.id} failed, falling back: {e}')
+            for user_id in chunk:
+                queue.put_nowait(user_id)
+            return
+        for user in result.banned:
+            settle(user.id, BANNED)
+        for user in result.failed:
+            settle(user.id, FAILED)
+
+    async def run():
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            if action == 'ban':
+                for start in range(0, len(user_ids), BULK_BAN_CHUNK):
+                    await bulk_ban(user_ids[start:start + BULK_BAN_CHUNK])
+            else:
+                for user_id in user_ids:
+                    queue.put_nowait(user_id)
+            for _ in workers:
+                queue.put_nowait(None)
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+
+    async def report():
+        if on_progress is None:
+            return
+        try:
+            await on_progress(progress)
+        except Exception as e:
+            logger.warning(f'⚠️ Bulk action progress update failed: {e}')
+
+    task = asyncio.create_task(run())
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=progress_interval)
+            if not task.done():
+                await report()
+        task.result()
+    except BaseException:
+        task.cancel()
+        raise
+
+    progress.done = True
+    await report()
+    return progress
+
+
+class BulkConfirmView(OwnerView):
+    """Run / cancel prompt for a bulk action"""
+
+    def __init__(self, owner_id: int):
+        super().__init__(owner_id, timeout=60)
+        self.value: Optional[bool] = None
+
+    @discord.ui.button(label="実行", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.value = True
+        self.stop()
+        await interaction.response.defer()
+
+    @discord.ui.button(label="キャンセル", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.value = False
+        self.stop()
+        await interaction.response.defer()
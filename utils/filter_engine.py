@@ -0,0 +1,547 @@
+import logging
+import re
+import time
+import unicodedata
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+import regex
+
+logger = logging.getLogger('discord')
+
+CLEAN = 'clean'
+WORD = 'word'
+URL = 'url'
+INVITE = 'invite'
+
+URL_PATTERN = r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+'
+INVITE_PATTERN = r'(?:discord\.gg|discord(?:app)?\.com/invite)/[\w-]+'
+
+# Every URL or invite contains one of these, so messages without them skip the regex entirely
+_LINK_MARKERS = ('http', '.gg', '/invite')
+
+_LINK_PATTERNS = {
+    (True, False): re.compile(f'(?P<url>{URL_PATTERN})'),
+    (False, True): re.compile(f'(?P<invite>{INVITE_PATTERN})'),
+    (True, True): re.compile(f'(?P<url>{URL_PATTERN})|(?P<invite>{INVITE_PATTERN})'),
+}
+
+
+# Invisible format characters dropped before word matching
+_STRIPPED = '\u00ad\u180e\u200b\u200c\u200d\u200e\u200f\u2060\ufeff'
+
+# Separators used to space letters out ("b.a.d", "b-a-d"); removed only inside such runs
+_SEPARATORS = '.,-_*~|/\\\'"`^+=:;・'
+
+# Lowercase look-alikes folded onto the Latin letter they imitate
+_CONFUSABLES = {
+    # Cyrillic
+    'а': 'a', 'в': 'b', 'е': 'e', 'к': 'k', 'м': 'm', 'н': 'h', 'о': 'o', 'р': 'p',
+    'с': 'c', 'т': 't', 'у': 'y', 'х': 'x', 'і': 'i', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd',
+    'һ': 'h', 'ӏ': 'l',
+    # Greek
+    'α': 'a', 'ε': 'e', 'ι': 'i', 'κ': 'k', 'ν': 'v', 'ο': 'o', 'ρ': 'p', 'τ': 't',
+    'υ': 'u', 'χ': 'x',
+}
+
+# Digits and symbols standing in for letters, folded only inside words that contain Latin letters
+_LEET = {'0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '@': 'a', '$': 's', '!': 'i'}
+
+
+def _build_fold_table() -> Dict[int, Optional[str]]:
+    table: Dict[int, Optional[str]] = {ord(char): None for char in _STRIPPED}
+    table.update({ord(char): folded for char, folded in _CONFUSABLES.items()})
+    # Katakana -> hiragana so "バカ" and "ばか" match the same word
+    for code in range(0x30A1, 0x30F7):
+        table[code] = chr(code - 0x60)
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+_LEET_TABLE = str.maketrans(_LEET)
+_SEPARATOR_TABLE = {ord(char): None for char in _SEPARATORS + ' \t\r\n\u3000'}
+
+_SEP_CLASS = re.escape(_SEPARATORS)
+# A run of single characters spaced out by whitespace ("b a d", "ば か") or by
+# separators inside one token ("b.a.d", "ば・か"); ordinary words never match.
+# Two spaced Latin letters are too common in normal text to count as a run.
+_SPACED_RUN = re.compile(
+    rf'(?<!\S)\w(?:\s+\w(?!\S)){{2,}}'
+    rf'|(?<!\S)[^\W\x00-\x7f](?:\s+[^\W\x00-\x7f](?!\S))+'
+    rf'|(?<!\S)\w(?:[{_SEP_CLASS}]+\w)+[{_SEP_CLASS}]*(?=[!?]*(?!\S))'
+)
+_LEET_CHAR = re.compile(f'[{re.escape("".join(_LEET))}]')
+_LEET_TOKEN = re.compile(rf'(?<!\S)\S*[{re.escape("".join(_LEET))}]\S*')
+_TRAILING_PUNCTUATION = '!?.,'
+
+
+def _nfkc_lower(text: str) -> str:
+    # ASCII is already NFKC, which skips the normalizer for most chat
+    if not text.isascii() and not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    return text.lower()
+
+
+def _collapse_run(match: 're.Match') -> str:
+    return match.group().translate(_SEPARATOR_TABLE)
+
+
+def _fold_leet(match: 're.Match') -> str:
+    token = match.group()
+    core = token.rstrip(_TRAILING_PUNCTUATION)
+    # "2023", "3x4" or "5.3.x" are numbers, not words spelled with digits
+    letters = sum(1 for char in core if 'a' <= char <= 'z')
+    if not letters or sum(1 for char in core if char.isdigit()) > letters:
+        return token
+    return core.translate(_LEET_TABLE) + token[len(core):]
+
+
+def _fold(text: str) -> str:
+    text = text.translate(_FOLD_TABLE)
+    text = _SPACED_RUN.sub(_collapse_run, text)
+    # Most messages have no digits or symbols; the single-class scan is much cheaper than the token sub
+    if _LEET_CHAR.search(text) is None:
+        return text
+    return _LEET_TOKEN.sub(_fold_leet, text)
+
+
+def normalize(text: str) -> str:
+    """Fold text for word matching: NFKC and lowercase, one translate pass that
+    strips zero-width characters and folds look-alikes, then separators are
+    collapsed inside spaced-out runs and leetspeak is folded inside words.
+    Spaces between ordinary words are kept so matches never span them."""
+    return _fold(_nfkc_lower(text))
+
+
+def _source_offset(content: str, index: int) -> int:
+    """Map an index in ``normalize(content)`` back to an index in ``content``.
+
+    Only called on a hit. Characters are NFKC-folded one at a time here, which
+    differs from the whole-string pass only around combining marks.
+    """
+    source: List[int] = []
+    pieces = []
+    for position, char in enumerate(content):
+        piece = _nfkc_lower(char).translate(_FOLD_TABLE)
+        pieces.append(piece)
+        source.extend([position] * len(piece))
+    text = ''.join(pieces)
+
+    # Leet folding is one-to-one; only run collapsing removes characters
+    removed = set()
+    for match in _SPACED_RUN.finditer(text):
+        removed.update(
+            position for position in range(match.start(), match.end())
+            if ord(text[position]) in _SEPARATOR_TABLE or text[position].isspace()
+        )
+    kept = [source[position] for position in range(len(text)) if position not in removed]
+    return kept[index] if index < len(kept) else len(content)
+
+
+class WordMatcher:
+    """Aho-Corasick automaton over the registered filter words.
+
+    The automaton is built once per word-list change; ``search`` then walks the
+    message a single time regardless of how many words are registered.
+    """
+
+    __slots__ = ('_goto', '_fail', '_out', '_words', '_lengths')
+
+    def __init__(self, words: Iterable[str]):
+        # Node 0 is the root. _out[node] holds the registration index of the
+        # highest-priority word ending at (or via fail links below) that node.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [-1]
+        self._words: List[str] = []
+        self._lengths: List[int] = []
+
+        seen = set()
+        for word in words:
+            key = normalize(word)
+            # A blank word would match every message with a space in it
+            if not key.strip() or key in seen:
+                continue
+            seen.add(key)
+            self._insert(key, len(self._words))
+            self._words.append(word)
+            self._lengths.append(len(key))
+
+        self._build_fail_links()
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def _insert(self, key: str, index: int):
+        node = 0
+        for char in key:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(-1)
+            node = nxt
+        if self._out[node] == -1:
+            self._out[node] = index
+
+    def _build_fail_links(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                inherited = out[fail[child]]
+                if inherited != -1 and (out[child] == -1 or inherited < out[child]):
+                    out[child] = inherited
+
+    def search(self, text: str) -> Optional[Tuple[str, int]]:
+        """Return ``(word, start)`` for the earliest-registered word found in ``text``.
+
+        ``text`` must already be folded with ``normalize``. The returned word is
+        the registered form so it can be used as a key into the settings dict.
+        """
+        if not self._words:
+            return None
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        best = -1
+        best_end = -1
+        for pos, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            hit = out[node]
+            if hit != -1 and (best == -1 or hit < best):
+                best = hit
+                best_end = pos
+                if best == 0:
+                    break
+
+        if best == -1:
+            return None
+        return self._words[best], best_end - self._lengths[best] + 1
+
+
+LITERAL = 'literal'
+PATTERN_TYPES = ('wildcard', 'word', 'regex')
+MAX_PATTERN_LENGTH = 200
+MAX_PATTERN_INPUT = 2000  # characters of a message pattern rules see; literal words scan it all
+PATTERN_TIMEOUT = 0.02  # seconds one combined pattern search may run before it is abandoned
+
+_PATTERN_FLAGS = regex.IGNORECASE | regex.VERSION0
+
+# Escapes, character classes and the group constructs that reach outside a rule once it
+# is combined with others: backreferences, recursion, conditionals and inline global flags
+_RULE_TOKEN = re.compile(
+    r'(?P<escape>\\.)'
+    r'|\[\^?\]?(?:\\.|[^\]\\])*\]'
+    r'|(?P<reference>\(\?(?:P[=>]|[&(]|R\)|[+-]?\d))'
+    r'|(?P<flags>\(\?[a-zA-Z-][\w-]*\))'
+    r'|.',
+    re.S
+)
+_BACKREF_ESCAPES = set('123456789gk')
+
+# Probe texts are built from these plus the rule's own characters. At a quarter of the
+# input a quadratic rule (sp*m on "spsp...") fits the budget, leaving the rare message
+# that pumps it to full length to the search timeout; cubic and exponential ones do not
+_PROBE_CHARS = 'a0 _-.あ'
+PROBE_LENGTH = MAX_PATTERN_INPUT // 4
+_PROBE_SPLIT = re.compile(r'[\\()\[\]{}|*+?.^$]+')
+
+
+def _rule_to_regex(rule_type: str, text: str) -> str:
+    if rule_type == 'regex':
+        return text
+    if rule_type == 'word':
+        return rf'\b{re.escape(text)}\b'
+    # wildcard: '*' is any run of word characters, '?' is exactly one
+    parts = []
+    for char in re.sub(r'\*+', '*', text):
+        if char == '*':
+            parts.append(r'\w*')
+        elif char == '?':
+            parts.append(r'\w')
+        else:
+            parts.append(re.escape(char))
+    return ''.join(parts)
+
+
+def _first_match(pattern: 'regex.Pattern', text: str) -> Optional['regex.Match']:
+    """Leftmost non-empty match of ``pattern``, raising TimeoutError past ``PATTERN_TIMEOUT``"""
+    for match in pattern.finditer(text, timeout=PATTERN_TIMEOUT):
+        # A zero-length hit (x?, \b) flags nothing; keep looking for real text
+        if match.end() > match.start():
+            return match
+    return None
+
+
+def _probes(text: str) -> List[str]:
+    """Inputs that pump each of the rule's characters and literal runs to ``PROBE_LENGTH``,
+    ending in a character no rule expects so backtracking has to unwind all of it"""
+    units = set(_PROBE_CHARS) | {char for char in text.lower() if not char.isspace()}
+    units.update(run for run in _PROBE_SPLIT.split(text.lower()) if len(run) > 1)
+    probes = []
+    for unit in sorted(units):
+        pumped = unit * (PROBE_LENGTH // len(unit) + 1)
+        probes.append(pumped[:PROBE_LENGTH - 1] + '\x00')
+    return probes
+
+
+def _too_slow(pattern: 'regex.Pattern', text: str) -> bool:
+    for probe in _probes(text):
+        started = time.perf_counter()
+        try:
+            _first_match(pattern, probe)
+        except TimeoutError:
+            return True
+        # The timeout is only checked between backtracking steps, so time the call as well
+        if time.perf_counter() - started > PATTERN_TIMEOUT:
+            return True
+    return False
+
+
+def _translate_rule(rule_type: str, text: str) -> str:
+    """The cheap half of ``compile_rule``: everything except the timing probes"""
+    if rule_type not in PATTERN_TYPES:
+        raise ValueError(f"不明なルール種別です: {rule_type}")
+    if not text.strip():
+        raise ValueError("空のパターンは使用できません")
+    if len(text) > MAX_PATTERN_LENGTH:
+        raise ValueError(f"パターンが長すぎます（最大{MAX_PATTERN_LENGTH}文字）")
+
+    source = _rule_to_regex(rule_type, text)
+    for token in _RULE_TOKEN.finditer(source):
+        if token['reference'] or (token['escape'] and token['escape'][1] in _BACKREF_ESCAPES):
+            raise ValueError("後方参照・再帰・条件分岐は使用できません")
+        if token['flags']:
+            raise ValueError("インラインフラグは (?i:...) のように範囲を指定してください")
+
+    try:
+        # Wrapped and flagged exactly as it will be in the combined pattern
+        compiled = regex.compile(f'(?:{source})', _PATTERN_FLAGS)
+    except regex.error as e:
+        raise ValueError(f"無効な正規表現です: {e}")
+    if compiled.groupindex:
+        raise ValueError("名前付きグループは使用できません")
+    if compiled.fullmatch('') is not None:
+        raise ValueError("空文字列に一致するパターン（例: *, a*, x?）は使用できません")
+    return source
+
+
+def compile_rule(rule_type: str, text: str) -> str:
+    """Translate and vet a pattern rule, returning its regex source.
+
+    Raises ValueError for rules that are blank, invalid, too long, match the
+    empty string, would break when combined with other rules (named groups,
+    backreferences, inline global flags), or take longer than
+    ``PATTERN_TIMEOUT`` on any probe text. The probes run on the same engine
+    and flags as ``PatternMatcher``, so shapes such as (a|aa)+$ are caught by
+    how they actually behave there rather than by their syntax.
+    """
+    source = _translate_rule(rule_type, text)
+    if _too_slow(regex.compile(source, _PATTERN_FLAGS), text):
+        raise ValueError("処理に時間がかかりすぎるパターンです（例: (a|aa)+$, (\\w+\\s?)+$）")
+    return source
+
+
+def compile_pattern(text: str) -> 'regex.Pattern':
+    """Vet a standalone regex the way a filter rule is vetted and compile it with
+    the matcher's flags; search it with ``timeout=PATTERN_TIMEOUT``"""
+    return regex.compile(compile_rule('regex', text), _PATTERN_FLAGS)
+
+
+class PatternMatcher:
+    """Wildcard / whole-word / regex rules compiled into one alternation.
+
+    Each rule becomes a named group ``r<index>`` so a single search both
+    finds the leftmost hit and tells which rule produced it. The alternation
+    runs on the ``regex`` engine so every search has a time budget: a rule
+    that slips past the compile-time checks can cost one message at most
+    ``PATTERN_TIMEOUT`` seconds instead of freezing the event loop.
+    """
+
+    __slots__ = ('_regex', '_rules')
+
+    def __init__(self, rules: Iterable[Tuple[str, str]]):
+        self._rules: List[str] = []
+        parts = []
+        for text, rule_type in rules:
+            try:
+                # Rules were probed when added; rebuilds only repeat the cheap checks
+                source = _translate_rule(rule_type, text)
+            except ValueError:
+                # Skip anything that no longer passes
+                continue
+            parts.append(f'(?P<r{len(self._rules)}>{source})')
+            self._rules.append(text)
+        self._regex = regex.compile('|'.join(parts), _PATTERN_FLAGS) if parts else None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def search(self, text: str) -> Optional[Tuple[str, int]]:
+        """Return ``(rule, start)`` for the leftmost non-empty rule match in ``text``"""
+        if self._regex is None:
+            return None
+        try:
+            match = _first_match(self._regex, text[:MAX_PATTERN_INPUT])
+        except TimeoutError:
+            logger.warning(f'⚠️ Filter pattern search exceeded {PATTERN_TIMEOUT * 1000:.0f}ms; treated as no match')
+            return None
+        if match is None:
+            return None
+        return self._rules[int(match.lastgroup[1:])], match.start()
+
+
+class Detection(NamedTuple):
+    kind: str
+    word: Optional[str] = None
+    start: int = -1
+
+
+_CLEAN = Detection(CLEAN)
+
+
+class MessageDetector:
+    """Single detection stage classifying a message as clean / word / URL / invite.
+
+    Precedence matches the original checks: banned words first, then URLs, then
+    invites. Link patterns are compiled once at import time and shared.
+    """
+
+    __slots__ = ('matcher', 'patterns', 'block_urls', 'block_invites', '_link_pattern', '_words', '_idle')
+
+    def __init__(
+        self,
+        matcher: WordMatcher,
+        block_urls: bool = False,
+        block_invites: bool = False,
+        patterns: Optional[PatternMatcher] = None
+    ):
+        self.matcher = matcher
+        self.patterns = patterns if patterns else None
+        self.block_urls = block_urls
+        self.block_invites = block_invites
+        self._link_pattern = _LINK_PATTERNS.get((block_urls, block_invites))
+        self._words = len(matcher) > 0
+        # Nothing configured: every message is clean without being normalized
+        self._idle = not self._words and self.patterns is None and self._link_pattern is None
+
+    def classify(self, content: str) -> Detection:
+        """Classify raw message content"""
+        if self._idle:
+            return _CLEAN
+        raw = content
+        content = _nfkc_lower(content)
+        if self._words:
+            match = self.matcher.search(_fold(content))
+            if match:
+                return Detection(WORD, match[0], _source_offset(raw, match[1]))
+
+        # Pattern rules see the unfolded text so word boundaries and separators still exist
+        if self.patterns is not None:
+            match = self.patterns.search(content)
+            if match:
+                return Detection(WORD, match[0], match[1])
+
+        # Links are matched on the unfolded text, where separators are still intact
+        pattern = self._link_pattern
+        if pattern is None or not any(marker in content for marker in _LINK_MARKERS):
+            return _CLEAN
+
+        invite = None
+        for hit in pattern.finditer(content):
+            if hit.lastgroup == 'url':
+                return Detection(URL, start=hit.start())
+            if invite is None:
+                invite = hit.start()
+                if not self.block_urls:
+                    break
+        if invite is not None:
+            return Detection(INVITE, start=invite)
+        return _CLEAN
+
+
+class GuildFilter:
+    """Filter configuration and compiled detector for a single guild"""
+
+    __slots__ = (
+        'filtered_words', 'block_urls', 'block_invites', 'log_channel_id', 'flood',
+        'exempt_roles', 'exempt_channels', 'exempt_categories',
+        'matcher', 'patterns', 'detector'
+    )
+
+    def __init__(self):
+        self.filtered_words: Dict[str, Dict] = {}
+        self.block_urls: bool = False
+        self.block_invites: bool = False
+        self.log_channel_id: Optional[int] = None
+        self.flood: Optional[Dict] = None  # penalty settings when flood detection is on
+        # Trusted traffic skipped before any scanning; replaced wholesale on change
+        self.exempt_roles: FrozenSet[int] = frozenset()
+        self.exempt_channels: FrozenSet[int] = frozenset()
+        self.exempt_categories: FrozenSet[int] = frozenset()
+        self.matcher = WordMatcher(self.filtered_words)
+        self.patterns: Optional[PatternMatcher] = None
+        self.detector = MessageDetector(self.matcher)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GuildFilter':
+        """Restore a filter from its stored form"""
+        guild_filter = cls()
+        guild_filter.filtered_words = data.get('filtered_words', {})
+        guild_filter.block_urls = data.get('block_urls', False)
+        guild_filter.block_invites = data.get('block_invites', False)
+        guild_filter.log_channel_id = data.get('log_channel_id')
+        guild_filter.flood = data.get('flood')
+        guild_filter.exempt_roles = frozenset(data.get('exempt_roles', ()))
+        guild_filter.exempt_channels = frozenset(data.get('exempt_channels', ()))
+        guild_filter.exempt_categories = frozenset(data.get('exempt_categories', ()))
+        guild_filter.rebuild_matcher()
+        return guild_filter
+
+    def to_dict(self) -> Dict:
+        """Serializable form for storage"""
+        return {
+            'filtered_words': self.filtered_words,
+            'block_urls': self.block_urls,
+            'block_invites': self.block_invites,
+            'log_channel_id': self.log_channel_id,
+            'flood': self.flood,
+            'exempt_roles': sorted(self.exempt_roles),
+            'exempt_channels': sorted(self.exempt_channels),
+            'exempt_categories': sorted(self.exempt_categories)
+        }
+
+    def is_exempt(self, channel_id: int, category_id: Optional[int], role_ids: Iterable[int]) -> bool:
+        """True if the message comes from an exempt channel, category or role"""
+        if channel_id in self.exempt_channels or category_id in self.exempt_categories:
+            return True
+        return bool(self.exempt_roles) and not self.exempt_roles.isdisjoint(role_ids)
+
+    def rebuild_matcher(self):
+        """Recompile the word automaton and pattern alternation after the word list changes"""
+        literals = []
+        rules = []
+        for word, settings in self.filtered_words.items():
+            rule_type = settings.get('type') or LITERAL
+            if rule_type == LITERAL:
+                literals.append(word)
+            else:
+                rules.append((word, rule_type))
+        self.matcher = WordMatcher(literals)
+        self.patterns = PatternMatcher(rules) if rules else None
+        self.rebuild_detector()
+
+    def rebuild_detector(self):
+        """Rebuild the detection stage after the word list or block flags change"""
+        self.detector = MessageDetector(self.matcher, self.block_urls, self.block_invites, self.patterns)
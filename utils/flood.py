@@ -0,0 +1,103 @@
+import time
+from array import array
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+RATE = 'rate'
+DUPLICATE = 'duplicate'
+SHARED_DUPLICATE = 'shared_duplicate'  # flooded content from an author who posted it only once
+
+
+class BucketCounter:
+    """Sliding-window event counter over a fixed ring of time buckets.
+
+    ``add`` touches one bucket and sums ``len(buckets)`` slots, so updates are
+    O(1) in the number of events and memory is fixed per key.
+    """
+
+    __slots__ = ('_counts', '_epochs')
+
+    def __init__(self, buckets: int):
+        self._counts = array('I', bytes(4 * buckets))
+        self._epochs = array('q', [-1]) * buckets
+
+    def add(self, epoch: int) -> int:
+        """Count one event in bucket ``epoch`` and return the window total"""
+        size = len(self._counts)
+        slot = epoch % size
+        if self._epochs[slot] != epoch:
+            self._epochs[slot] = epoch
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+
+        oldest = epoch - size
+        return sum(count for count, stamp in zip(self._counts, self._epochs) if stamp > oldest)
+
+
+class _BoundedCounters:
+    """LRU-bounded map of key -> BucketCounter"""
+
+    __slots__ = ('buckets', 'max_keys', '_counters')
+
+    def __init__(self, buckets: int, max_keys: int):
+        self.buckets = buckets
+        self.max_keys = max_keys
+        self._counters: 'OrderedDict[Hashable, BucketCounter]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def add(self, key: Hashable, epoch: int) -> int:
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = BucketCounter(self.buckets)
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+        return counter.add(epoch)
+
+
+class FloodDetector:
+    """Message-rate and duplicate-content flood detection.
+
+    Tracks messages per (guild, user) and per (guild, content hash) in
+    one-second buckets. A user is flagged for posting more than ``rate_limit``
+    messages within ``rate_window`` seconds; any content is flagged once it has
+    been posted more than ``duplicate_limit`` times within ``duplicate_window``
+    seconds in a guild. Authors who repeated that content themselves get
+    DUPLICATE; authors who posted it once, such as members sending a common
+    greeting, get SHARED_DUPLICATE so the cog can skip their penalty.
+    """
+
+    def __init__(
+        self,
+        rate_limit: int = 8,
+        rate_window: int = 5,
+        duplicate_limit: int = 4,
+        duplicate_window: int = 10,
+        min_duplicate_length: int = 8,
+        max_keys: int = 50_000
+    ):
+        self.rate_limit = rate_limit
+        self.duplicate_limit = duplicate_limit
+        self.min_duplicate_length = min_duplicate_length
+        self._rates = _BoundedCounters(rate_window, max_keys)
+        self._duplicates = _BoundedCounters(duplicate_window, max_keys)
+        self._user_duplicates = _BoundedCounters(duplicate_window, max_keys)
+
+    def check(self, guild_id: int, user_id: int, content: str, now: Optional[float] = None) -> Optional[str]:
+        """Record a message and return RATE, DUPLICATE, SHARED_DUPLICATE or None"""
+        epoch = int(time.monotonic() if now is None else now)
+
+        if self._rates.add((guild_id, user_id), epoch) > self.rate_limit:
+            return RATE
+
+        # Short messages ("gg", "w") repeat naturally and are not tracked
+        if len(content) >= self.min_duplicate_length:
+            content_hash = hash(content)
+            total = self._duplicates.add((guild_id, content_hash), epoch)
+            repeats = self._user_duplicates.add((guild_id, user_id, content_hash), epoch)
+            if total > self.duplicate_limit:
+                return DUPLICATE if repeats > 1 else SHARED_DUPLICATE
+        return None
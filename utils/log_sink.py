@@ -0,0 +1,173 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+import discord
+
+logger = logging.getLogger('discord')
+
+# Discord's per-message limits for embeds
+MAX_EMBEDS = 10
+MAX_CHARS = 6000
+
+
+def embed_batches(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+    """Split embeds, in order, into messages within MAX_EMBEDS and MAX_CHARS"""
+    batches, batch, chars = [], [], 0
+    for embed in embeds:
+        if batch and (len(batch) == MAX_EMBEDS or chars + len(embed) > MAX_CHARS):
+            batches.append(batch)
+            batch, chars = [], 0
+        batch.append(embed)
+        chars += len(embed)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class ChannelQueue:
+    """Bounded embed queue for one log channel, drained by a single worker"""
+
+    __slots__ = ('channel_id', 'queue', 'worker', 'pending', 'sent', 'batches', 'dropped', 'failed')
+
+    def __init__(self, channel_id: int, max_size: int):
+        self.channel_id = channel_id
+        self.queue: asyncio.Queue = asyncio.Queue(max_size)
+        self.worker: Optional[asyncio.Task] = None
+        self.pending: List[discord.Embed] = []  # batch being collected, not yet sent
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+
+
+class LogSink:
+    """Per-channel send queues that coalesce log embeds into multi-embed messages.
+
+    Each log channel gets a bounded queue and one worker. The worker takes the
+    first queued embed, keeps collecting for up to ``linger`` seconds and sends
+    as soon as ``MAX_EMBEDS`` embeds or ``MAX_CHARS`` characters are pending,
+    so a burst of events costs one request per ten embeds instead of one each.
+
+    When a channel's queue is full, ``submit`` waits up to ``put_timeout``
+    seconds for room (backpressure) and then drops the embed and counts it.
+    """
+
+    MAX_EMBEDS = MAX_EMBEDS
+    MAX_CHARS = MAX_CHARS
+
+    def __init__(
+        self,
+        resolve: Callable[[int], Optional[discord.abc.Messageable]],
+        max_queue: int = 500,
+        linger: float = 2.0,
+        put_timeout: float = 5.0,
+        idle_timeout: float = 300.0
+    ):
+        self._resolve = resolve
+        self.max_queue = max_queue
+        self.linger = linger
+        self.put_timeout = put_timeout
+        self.idle_timeout = idle_timeout
+        self._channels: Dict[int, ChannelQueue] = {}
+        self._closed = False
+
+    async def submit(self, channel_id: int, embed: discord.Embed) -> bool:
+        """Queue an embed for a channel; returns False if it was dropped"""
+        if self._closed:
+            return False
+        state = self._channels.get(channel_id)
+        if state is None:
+            state = self._channels[channel_id] = ChannelQueue(channel_id, self.max_queue)
+        if state.worker is None:
+            state.worker = asyncio.create_task(self._run(state))
+
+        try:
+            state.queue.put_nowait(embed)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(state.queue.put(embed), self.put_timeout)
+            except asyncio.TimeoutError:
+                state.dropped += 1
+                if state.dropped == 1 or state.dropped % 100 == 0:
+                    logger.warning(f'⚠️ Log queue for {channel_id} is full; {state.dropped} embeds dropped')
+                return False
+        return True
+
+    def stats(self, channel_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
+        """Queue depth and counters per channel"""
+        return {
+            channel_id: {
+                'depth': state.queue.qsize() + len(state.pending),
+                'sent': state.sent,
+                'batches': state.batches,
+                'dropped': state.dropped,
+                'failed': state.failed
+            }
+            for channel_id, state in self._channels.items()
+            if channel_ids is None or channel_id in channel_ids
+        }
+
+    async def close(self):
+        """Stop the workers and send whatever is still queued"""
+        self._closed = True
+        for state in list(self._channels.values()):
+            if state.worker:
+                state.worker.cancel()
+                state.worker = None
+            embeds, state.pending = state.pending, []
+            while not state.queue.empty():
+                embeds.append(state.queue.get_nowait())
+            for batch in embed_batches(embeds):
+                await self._send(state, batch)
+
+    async def _run(self, state: ChannelQueue):
+        queue = state.queue
+        loop = asyncio.get_running_loop()
+        carry: Optional[discord.Embed] = None
+        while True:
+            if carry is None:
+                try:
+                    carry = await asyncio.wait_for(queue.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        # Idle channel: release the worker, submit starts a new one
+                        state.worker = None
+                        return
+                    continue
+
+            batch, chars, carry = [carry], len(carry), None
+            state.pending = batch
+            deadline = loop.time() + self.linger
+            while len(batch) < self.MAX_EMBEDS:
+                if queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        embed = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    embed = queue.get_nowait()
+                if chars + len(embed) > self.MAX_CHARS:
+                    carry = embed
+                    break
+                batch.append(embed)
+                chars += len(embed)
+
+            state.pending = []
+            await self._send(state, batch)
+
+    async def _send(self, state: ChannelQueue, embeds: List[discord.Embed]):
+        channel = self._resolve(state.channel_id)
+        if channel is None:
+            state.failed += len(embeds)
+            return
+        try:
+            await channel.send(embeds=embeds)
+            state.sent += len(embeds)
+            state.batches += 1
+        except Exception as e:
+            state.failed += len(embeds)
+            logger.error(f'❌ Failed to send {len(embeds)} log embeds to {state.channel_id}: {e}')
@@ -0,0 +1,25 @@
+from typing import Optional
+
+import discord
+
+
+async def resolve_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Return a guild member, preferring the gateway cache over a REST fetch.
+
+    With the members intent enabled the cache almost always has the member,
+    so the REST round-trip only happens on a miss. Returns None if the user
+    is not in the guild.
+    """
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
+
+
+def display_name_for(guild: discord.Guild, user_id: int) -> str:
+    """Name for a user from cache only, falling back to the raw ID"""
+    member = guild.get_member(user_id)
+    return member.name if member else str(user_id)
@@ -0,0 +1,149 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+
+class CachedMessage:
+    """The parts of a message that edit/delete logging needs"""
+
+    __slots__ = ('id', 'author_id', 'channel_id', 'content', 'attachments', 'cached_at')
+
+    def __init__(
+        self,
+        message_id: int,
+        author_id: int,
+        channel_id: int,
+        content: str,
+        attachments: Tuple[str, ...] = (),
+        cached_at: Optional[float] = None
+    ):
+        self.id = message_id
+        self.author_id = author_id
+        self.channel_id = channel_id
+        self.content = content
+        self.attachments = attachments
+        self.cached_at = time.monotonic() if cached_at is None else cached_at
+
+    @classmethod
+    def from_message(cls, message: discord.Message) -> 'CachedMessage':
+        return cls(
+            message.id,
+            message.author.id,
+            message.channel.id,
+            message.content,
+            tuple(attachment.url for attachment in message.attachments)
+        )
+
+    @property
+    def created_at(self):
+        return discord.utils.snowflake_time(self.id)
+
+    def size(self) -> int:
+        """Approximate memory held by this record, in bytes"""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.content)
+            + sys.getsizeof(self.attachments)
+            + sum(sys.getsizeof(url) for url in self.attachments)
+        )
+
+
+class MessageCache:
+    """Per-guild message content cache bounded by count and age.
+
+    Each guild keeps at most ``max_messages`` records in insertion order;
+    the oldest are evicted first. Records older than ``max_age`` seconds are
+    dropped whenever their guild's cache is touched, and ``sweep`` clears
+    guilds that have gone quiet. The approximate memory held is tracked
+    incrementally so it can be reported without walking the cache.
+    """
+
+    def __init__(self, max_messages: int = 5000, max_age: float = 86400.0):
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self._guilds: Dict[int, 'OrderedDict[int, CachedMessage]'] = {}
+        self._bytes = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return sum(len(messages) for messages in self._guilds.values())
+
+    @property
+    def memory(self) -> int:
+        return self._bytes
+
+    def add(self, guild_id: int, record: CachedMessage):
+        messages = self._guilds.get(guild_id)
+        if messages is None:
+            messages = self._guilds[guild_id] = OrderedDict()
+
+        old = messages.pop(record.id, None)
+        if old is not None:
+            self._bytes -= old.size()
+        messages[record.id] = record
+        self._bytes += record.size()
+        self._trim(messages, record.cached_at)
+
+    def _trim(self, messages: 'OrderedDict[int, CachedMessage]', now: float):
+        # Insertion order is arrival order, so expired and excess records are at the front
+        cutoff = now - self.max_age
+        while messages:
+            oldest = next(iter(messages.values()))
+            if len(messages) <= self.max_messages and oldest.cached_at >= cutoff:
+                break
+            del messages[oldest.id]
+            self._bytes -= oldest.size()
+            self.evicted += 1
+
+    def _live(self, guild_id: int) -> Optional['OrderedDict[int, CachedMessage]']:
+        """A guild's records with expired ones dropped first"""
+        messages = self._guilds.get(guild_id)
+        if messages:
+            self._trim(messages, time.monotonic())
+        return messages
+
+    def get(self, guild_id: int, message_id: int) -> Optional[CachedMessage]:
+        messages = self._live(guild_id)
+        return messages.get(message_id) if messages else None
+
+    def update(self, guild_id: int, message_id: int, content: str) -> Optional[str]:
+        """Replace a cached record's content and return the previous content"""
+        record = self.get(guild_id, message_id)
+        if record is None:
+            return None
+        previous = record.content
+        self._bytes += sys.getsizeof(content) - sys.getsizeof(previous)
+        record.content = content
+        return previous
+
+    def pop(self, guild_id: int, message_id: int) -> Optional[CachedMessage]:
+        messages = self._live(guild_id)
+        record = messages.pop(message_id, None) if messages else None
+        if record is not None:
+            self._bytes -= record.size()
+        return record
+
+    def pop_many(self, guild_id: int, message_ids: Iterable[int]) -> List[CachedMessage]:
+        return [record for record in (self.pop(guild_id, message_id) for message_id in message_ids) if record]
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop expired records from every guild and return how many were dropped"""
+        now = time.monotonic() if now is None else now
+        before = self.evicted
+        for guild_id, messages in list(self._guilds.items()):
+            self._trim(messages, now)
+            if not messages:
+                del self._guilds[guild_id]
+        return self.evicted - before
+
+    def remove_guild(self, guild_id: int):
+        for record in self._guilds.pop(guild_id, {}).values():
+            self._bytes -= record.size()
+
+    def guild_stats(self, guild_id: int) -> Tuple[int, int]:
+        """(message count, approximate bytes) for one guild"""
+        messages = self._live(guild_id) or {}
+        return len(messages), sum(record.size() for record in messages.values())
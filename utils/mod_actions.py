@@ -0,0 +1,107 @@
+import discord
+from discord.ui import View
+
+from utils.members import display_name_for, resolve_member
+from utils.mod_ledger import DEDUPE_WINDOW
+
+LEFT_GUILD = "このユーザーは既にサーバーにいません。"
+
+# action -> (label, style)
+ACTIONS = {
+    'ban': ("Ban", discord.ButtonStyle.danger),
+    'kick': ("Kick", discord.ButtonStyle.danger),
+    'warn': ("警告DM", discord.ButtonStyle.primary),
+}
+
+
+class ModActionButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r'modaction:(?P<action>ban|kick|warn):(?P<user_id>\d+)'
+):
+    """Moderation button whose custom_id carries the action and target user.
+
+    Registered once with ``Bot.add_dynamic_items`` so buttons on any log
+    message keep working after a restart without holding a View per message.
+    """
+
+    def __init__(self, action: str, user_id: int):
+        label, style = ACTIONS[action]
+        super().__init__(
+            discord.ui.Button(label=label, style=style, custom_id=f'modaction:{action}:{user_id}')
+        )
+        self.action = action
+        self.user_id = user_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['action'], int(match['user_id']))
+
+    async def callback(self, interaction: discord.Interaction):
+        if self.action == 'ban':
+            await self._ban(interaction)
+        elif self.action == 'kick':
+            await self._kick(interaction)
+        else:
+            await self._warn(interaction)
+
+    async def _ban(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.ban_members:
+            await interaction.response.send_message("BANの権限がありません。", ephemeral=True)
+            return
+
+        ledger = interaction.client.storage.ledger
+        try:
+            # The audit log entry can arrive before the REST call returns
+            ledger.expect(interaction.guild.id, [self.user_id], 'ban', window=DEDUPE_WINDOW)
+            # BAN works by ID, so the member never needs to be resolved
+            await interaction.guild.ban(discord.Object(id=self.user_id), reason="サーバー内での違反")
+            ledger.record(
+                interaction.guild.id, self.user_id, 'ban',
+                moderator_id=interaction.user.id, reason="サーバー内での違反", source='button'
+            )
+            name = display_name_for(interaction.guild, self.user_id)
+            await interaction.response.send_message(f"{name}をBANしました。", ephemeral=True)
+        except:
+            await interaction.response.send_message("BANに失敗しました。", ephemeral=True)
+
+    async def _kick(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.kick_members:
+            await interaction.response.send_message("KICKの権限がありません。", ephemeral=True)
+            return
+
+        ledger = interaction.client.storage.ledger
+        try:
+            member = await resolve_member(interaction.guild, self.user_id)
+            if member is None:
+                await interaction.response.send_message(LEFT_GUILD, ephemeral=True)
+                return
+            ledger.expect(interaction.guild.id, [self.user_id], 'kick', window=DEDUPE_WINDOW)
+            await member.kick(reason="サバー内での違反")
+            ledger.record(
+                interaction.guild.id, member.id, 'kick',
+                moderator_id=interaction.user.id, reason="サバー内での違反", source='button'
+            )
+            await interaction.response.send_message(f"{member.name}をKICKしました。", ephemeral=True)
+        except:
+            await interaction.response.send_message("KICKに失敗しました。", ephemeral=True)
+
+    async def _warn(self, interaction: discord.Interaction):
+        try:
+            member = await resolve_member(interaction.guild, self.user_id)
+            if member is None:
+                await interaction.response.send_message(LEFT_GUILD, ephemeral=True)
+                return
+            await member.send(f"{member.name}さん、サーバーのルールに違反する投稿が検出されました。\n今後このような投稿は控えてください。")
+            await interaction.response.send_message(f"{member.name}に警告DMを送信しました。", ephemeral=True)
+        except:
+            await interaction.response.send_message("DMの送信に失敗しました。", ephemeral=True)
+
+
+class ModActionView(View):
+    """Ban / Kick / warn buttons for one user, built from persistent dynamic items"""
+
+    def __init__(self, user_id: int):
+        super().__init__(timeout=None)
+        self.user_id = user_id
+        for action in ACTIONS:
+            self.add_item(ModActionButton(action, user_id))
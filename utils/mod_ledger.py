@@ -0,0 +1,231 @@
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import discord
+
+from utils.paging import CachedPager, PagedView
+
+if TYPE_CHECKING:
+    from utils.storage import Storage
+
+PAGE_SIZE = 10
+DEDUPE_WINDOW = 60.0  # seconds a direct record suppresses the bot's own audit log entry
+
+# Audit log action -> ledger action; timeouts arrive as member_update and are handled separately
+AUDIT_ACTIONS = {
+    discord.AuditLogAction.kick: 'kick',
+    discord.AuditLogAction.ban: 'ban',
+    discord.AuditLogAction.unban: 'unban',
+}
+
+LEDGER_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS mod_actions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        moderator_id INTEGER,
+        reason TEXT,
+        source TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS mod_actions_guild_action ON mod_actions (guild_id, action, id)",
+    "CREATE INDEX IF NOT EXISTS mod_actions_guild_user ON mod_actions (guild_id, user_id, action, id)",
+)
+
+LEDGER_INSERT = (
+    "INSERT INTO mod_actions (guild_id, user_id, action, moderator_id, reason, source, created_at, expires_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+LedgerRow = Tuple[int, int, str, Optional[int], Optional[str], str, float, Optional[float]]
+
+
+class LedgerEntry(NamedTuple):
+    id: int
+    user_id: int
+    action: str
+    moderator_id: Optional[int]
+    reason: Optional[str]
+    source: str
+    created_at: float
+    expires_at: Optional[float]
+
+
+class ModLedger:
+    """Local, indexed history of moderation actions per guild.
+
+    Actions the bot performs itself are recorded directly so they keep the
+    real moderator and the source (filter, button, ...); everything else is
+    picked up from audit log events. Rows are buffered and written by the
+    owning Storage in its batched flush, so recording never waits on disk.
+    """
+
+    def __init__(self, storage: 'Storage'):
+        self.storage = storage
+        self._pending: List[LedgerRow] = []
+        self._recent: Dict[Tuple[int, int, str], float] = {}
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def record(
+        self,
+        guild_id: int,
+        user_id: int,
+        action: str,
+        moderator_id: Optional[int] = None,
+        reason: Optional[str] = None,
+        source: str = 'bot',
+        created_at: Optional[float] = None,
+        expires_at: Optional[float] = None
+    ):
+        """Buffer an action the bot performed itself"""
+        now = time.time()
+        key = (guild_id, user_id, action)
+        self._recent[key] = max(self._recent.get(key, 0.0), now + DEDUPE_WINDOW)
+        self._pending.append((
+            guild_id, user_id, action, moderator_id, reason, source,
+            now if created_at is None else created_at, expires_at
+        ))
+
+    def expect(self, guild_id: int, user_ids: Iterable[int], action: str, window: float):
+        """Suppress the bot's own audit entries for actions it will record within ``window`` seconds.
+
+        The audit log entry of an action can arrive before the request that
+        performed it returns, so long-running batches mark their targets up front.
+        """
+        deadline = time.time() + window
+        for user_id in user_ids:
+            self._recent[(guild_id, user_id, action)] = deadline
+
+    def record_audit_entry(self, entry: discord.AuditLogEntry, bot_id: int):
+        """Buffer a kick, ban, unban or timeout observed through the audit log"""
+        action = AUDIT_ACTIONS.get(entry.action)
+        expires_at = None
+        if action is None and entry.action == discord.AuditLogAction.member_update:
+            until = getattr(entry.after, 'timed_out_until', None)
+            if until is None or until == getattr(entry.before, 'timed_out_until', None):
+                return
+            action, expires_at = 'timeout', until.timestamp()
+        if action is None or entry.target is None:
+            return
+
+        key = (entry.guild.id, entry.target.id, action)
+        if entry.user_id == bot_id and self._is_recent(key):
+            # Already recorded with the real moderator when the bot performed it
+            del self._recent[key]
+            return
+        self._pending.append((
+            entry.guild.id, entry.target.id, action, entry.user_id, entry.reason, 'audit',
+            entry.created_at.timestamp(), expires_at
+        ))
+
+    def take_pending(self) -> List[LedgerRow]:
+        pending, self._pending = self._pending, []
+        self._prune_recent()
+        return pending
+
+    def requeue(self, rows: List[LedgerRow]):
+        self._pending[:0] = rows
+
+    async def history(
+        self,
+        guild_id: int,
+        action: str,
+        user_id: Optional[int] = None,
+        before: Optional[int] = None,
+        limit: int = PAGE_SIZE
+    ) -> List[LedgerEntry]:
+        """Newest-first page of actions, continuing below the ``before`` row id"""
+        if self._pending:
+            await self.storage.flush()
+
+        sql = (
+            "SELECT id, user_id, action, moderator_id, reason, source, created_at, expires_at "
+            "FROM mod_actions WHERE guild_id = ? AND action = ?"
+        )
+        params: list = [guild_id, action]
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        if before is not None:
+            sql += " AND id < ?"
+            params.append(before)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [LedgerEntry(*row) for row in await self.storage.fetch(sql, params)]
+
+    def _is_recent(self, key: Tuple[int, int, str]) -> bool:
+        deadline = self._recent.get(key)
+        return deadline is not None and time.time() < deadline
+
+    def _prune_recent(self):
+        now = time.time()
+        for key in [key for key, deadline in self._recent.items() if deadline < now]:
+            del self._recent[key]
+
+
+class LedgerPager(CachedPager[LedgerEntry]):
+    """Cursor pager over one guild's ledger, caching the pages it has seen"""
+
+    def __init__(self, ledger: ModLedger, guild_id: int, action: str, user_id: Optional[int] = None):
+        super().__init__()
+        self.ledger = ledger
+        self.guild_id = guild_id
+        self.action = action
+        self.user_id = user_id
+
+    async def _fill_page(self):
+        before = self.pages[-1][-1].id if self.pages else None
+        # One extra row tells whether another page exists without a second query
+        rows = await self.ledger.history(
+            self.guild_id, self.action, self.user_id, before=before, limit=PAGE_SIZE + 1
+        )
+        if len(rows) <= PAGE_SIZE:
+            self.exhausted = True
+        if rows[:PAGE_SIZE]:
+            self.pages.append(rows[:PAGE_SIZE])
+
+
+# action -> (title, color)
+HISTORY_TITLES = {
+    'kick': ("KICKされたユーザー", discord.Color.orange()),
+    'ban': ("BAN履歴", discord.Color.red()),
+    'timeout': ("タイムアウト履歴", discord.Color.yellow()),
+}
+
+SOURCE_LABELS = {
+    'filter': "フィルター",
+    'button': "ボタン",
+    'bulk': "一括処理",
+}
+
+
+class LedgerListView(PagedView):
+    """Ledger history pages with prev/next buttons"""
+
+    pager: LedgerPager
+
+    def build_embed(self, entries: List[LedgerEntry]) -> discord.Embed:
+        title, color = HISTORY_TITLES[self.pager.action]
+        embed = discord.Embed(title=title, color=color)
+        for entry in entries:
+            lines = [
+                f"対象: <@{entry.user_id}>",
+                f"実行者: {f'<@{entry.moderator_id}>' if entry.moderator_id else '不明'}",
+                f"日時: <t:{int(entry.created_at)}:f>",
+            ]
+            if entry.expires_at:
+                lines.append(f"解除: <t:{int(entry.expires_at)}:f>")
+            if entry.source in SOURCE_LABELS:
+                lines.append(f"経路: {SOURCE_LABELS[entry.source]}")
+            lines.append(f"理由: {entry.reason or '理由なし'}")
+            embed.add_field(name=f"ユーザーID: {entry.user_id}", value="\n".join(lines)[:1024], inline=False)
+        if not entries:
+            embed.description = "該当する記録はありません。"
+        return embed
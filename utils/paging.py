@@ -0,0 +1,82 @@
+from typing import Generic, List, TypeVar
+
+import discord
+
+T = TypeVar('T')
+
+
+class OwnerView(discord.ui.View):
+    """View whose components only the member who opened it may use"""
+
+    def __init__(self, owner_id: int, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.owner_id = owner_id
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("このボタンはコマンドの実行者のみ使用できます。", ephemeral=True)
+            return False
+        return True
+
+
+class CachedPager(Generic[T]):
+    """Forward-only pager that keeps every page it has produced.
+
+    Subclasses implement ``_fill_page``, which appends the next page to
+    ``pages`` or sets ``exhausted`` (or both); pages before the furthest one
+    viewed are served from memory.
+    """
+
+    def __init__(self):
+        self.pages: List[List[T]] = []
+        self.exhausted = False
+
+    @property
+    def known_pages(self) -> int:
+        return len(self.pages)
+
+    async def page(self, index: int) -> List[T]:
+        """Return page ``index``, fetching forward from the last seen page if needed"""
+        while len(self.pages) <= index and not self.exhausted:
+            await self._fill_page()
+        return self.pages[index] if index < len(self.pages) else []
+
+    def has_next(self, index: int) -> bool:
+        return index + 1 < len(self.pages) or not self.exhausted
+
+    async def _fill_page(self):
+        raise NotImplementedError
+
+
+class PagedView(OwnerView):
+    """Prev/next buttons over a CachedPager; subclasses build the embed for one page"""
+
+    def __init__(self, pager: CachedPager, owner_id: int):
+        super().__init__(owner_id, timeout=300)
+        self.pager = pager
+        self.index = 0
+
+    def build_embed(self, entries: list) -> discord.Embed:
+        raise NotImplementedError
+
+    async def render(self) -> discord.Embed:
+        embed = self.build_embed(await self.pager.page(self.index))
+        total = f" / {self.pager.known_pages}" if self.pager.exhausted else ""
+        embed.set_footer(text=f"ページ {self.index + 1}{total}")
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = not self.pager.has_next(self.index)
+        return embed
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = max(0, self.index - 1)
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # The next page may need a fetch, which can outlast the 3s interaction deadline
+        await interaction.response.defer()
+        entries = await self.pager.page(self.index + 1)
+        if entries:
+            self.index += 1
+        await interaction.edit_original_response(embed=await self.render(), view=self)
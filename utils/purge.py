@@ -0,0 +1,218 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import discord
+
+logger = logging.getLogger('discord')
+
+BULK_DELETE_CHUNK = 100
+# Discord rejects bulk deletes of messages older than 14 days; keep a margin
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+
+
+class PurgeFilter:
+    """Which messages a purge deletes: by author and/or content substring"""
+
+    __slots__ = ('user_id', 'contains')
+
+    def __init__(self, user_id: Optional[int] = None, contains: Optional[str] = None):
+        self.user_id = user_id
+        self.contains = contains.lower() if contains else None
+
+    def __call__(self, message: discord.Message) -> bool:
+        if self.user_id is not None and message.author.id != self.user_id:
+            return False
+        if self.contains is not None and self.contains not in message.content.lower():
+            return False
+        return True
+
+    @property
+    def is_empty(self) -> bool:
+        return self.user_id is None and self.contains is None
+
+
+class PurgeProgress:
+    """Running counters for one purge"""
+
+    __slots__ = ('scanned', 'matched', 'bulk_deleted', 'single_deleted', 'failed', 'done')
+
+    def __init__(self):
+        self.scanned = 0
+        self.matched = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.done = False
+
+    @property
+    def deleted(self) -> int:
+        return self.bulk_deleted + self.single_deleted
+
+    @classmethod
+    def total(cls, progresses: Iterable['PurgeProgress']) -> 'PurgeProgress':
+        combined = cls()
+        combined.done = True
+        for progress in progresses:
+            combined.scanned += progress.scanned
+            combined.matched += progress.matched
+            combined.bulk_deleted += progress.bulk_deleted
+            combined.single_deleted += progress.single_deleted
+            combined.failed += progress.failed
+            combined.done = combined.done and progress.done
+        return combined
+
+
+ProgressCallback = Callable[[PurgeProgress], Awaitable[None]]
+
+
+async def purge(
+    channel: discord.TextChannel,
+    check: Callable[[discord.Message], bool],
+    limit: int,
+    *,
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    max_scan: Optional[int] = None,
+    single_delete_interval: float = 1.0,
+    on_progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 2.0,
+    reason: Optional[str] = None,
+    progress: Optional[PurgeProgress] = None
+) -> PurgeProgress:
+    """Delete up to ``limit`` messages matching ``check``, newest first.
+
+    History is paged lazily, so memory stays at one page plus one pending
+    chunk however far back the purge reaches. Matches younger than 14 days are
+    bulk-deleted in chunks of 100; older ones are handed to a single-delete
+    worker paced at one request per ``single_delete_interval`` seconds, which
+    runs while the scan continues. ``on_progress`` is called at most every
+    ``progress_interval`` seconds and once at the end. Pass ``progress`` to
+    have the counters updated in an object the caller already holds.
+    """
+    progress = progress if progress is not None else PurgeProgress()
+    loop = asyncio.get_running_loop()
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    singles: asyncio.Queue = asyncio.Queue()
+    chunk: List[discord.Message] = []
+    last_report = loop.time()
+
+    async def single_worker():
+        while True:
+            message = await singles.get()
+            if message is None:
+                return
+            try:
+                await message.delete()
+                progress.single_deleted += 1
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                progress.failed += 1
+                logger.warning(f'⚠️ Failed to delete message {message.id} in {channel.id}: {e}')
+            await asyncio.sleep(single_delete_interval)
+
+    async def flush_chunk():
+        if not chunk:
+            return
+        batch = chunk.copy()
+        chunk.clear()
+        try:
+            await channel.delete_messages(batch, reason=reason)
+            progress.bulk_deleted += len(batch)
+        except discord.HTTPException as e:
+            # One stale or already-deleted message fails the whole request; retry one by one
+            logger.warning(f'⚠️ Bulk delete of {len(batch)} messages in {channel.id} failed, falling back: {e}')
+            for message in batch:
+                singles.put_nowait(message)
+
+    async def report(force: bool = False):
+        nonlocal last_report
+        if on_progress is None or (not force and loop.time() - last_report < progress_interval):
+            return
+        last_report = loop.time()
+        try:
+            await on_progress(progress)
+        except Exception as e:
+            logger.warning(f'⚠️ Purge progress update failed: {e}')
+
+    worker = asyncio.create_task(single_worker())
+    try:
+        async for message in channel.history(limit=max_scan, after=after, before=before, oldest_first=False):
+            progress.scanned += 1
+            await report()
+            if not check(message):
+                continue
+
+            progress.matched += 1
+            if message.created_at > cutoff:
+                chunk.append(message)
+                if len(chunk) >= BULK_DELETE_CHUNK:
+                    await flush_chunk()
+            else:
+                singles.put_nowait(message)
+
+            if progress.matched >= limit:
+                break
+
+        await flush_chunk()
+    except BaseException:
+        worker.cancel()
+        raise
+
+    # Old messages may still be draining one by one; keep reporting until they are done
+    singles.put_nowait(None)
+    while not worker.done():
+        await asyncio.wait({worker}, timeout=progress_interval)
+        await report()
+
+    progress.done = True
+    await report(force=True)
+    return progress
+
+
+async def purge_channels(
+    channels: List[discord.TextChannel],
+    check: Callable[[discord.Message], bool],
+    limit_per_channel: int,
+    *,
+    concurrency: int = 4,
+    on_progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 2.0,
+    **options
+) -> Dict[discord.TextChannel, PurgeProgress]:
+    """Run ``purge`` over many channels at once, at most ``concurrency`` at a time.
+
+    Bulk and single deletes are rate-limited per channel, so workers on
+    different channels do not wait on each other's buckets and the total time
+    approaches that of the slowest channel. The bound keeps the combined
+    request rate under the global limit. ``on_progress`` receives the
+    aggregate over all channels. Remaining keyword arguments go to ``purge``.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {channel: PurgeProgress() for channel in channels}
+
+    async def worker(channel: discord.TextChannel):
+        async with semaphore:
+            try:
+                await purge(channel, check, limit_per_channel, progress=results[channel], **options)
+            except discord.HTTPException as e:
+                logger.warning(f'⚠️ Purge of channel {channel.id} stopped: {e}')
+            results[channel].done = True
+
+    tasks = [asyncio.create_task(worker(channel)) for channel in channels]
+    try:
+        pending = set(tasks)
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=progress_interval)
+            if on_progress is not None:
+                try:
+                    await on_progress(PurgeProgress.total(results.values()))
+                except Exception as e:
+                    logger.warning(f'⚠️ Purge progress update failed: {e}')
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return results
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import aiosqlite
+
+from utils.mod_ledger import LEDGER_INSERT, LEDGER_SCHEMA, ModLedger
+
+logger = logging.getLogger('discord')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_state (
+    namespace TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (namespace, guild_id)
+)
+"""
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class ConfigCache:
+    """Guild-keyed, write-behind cache over one storage namespace.
+
+    Once a guild is loaded every read is served from memory. Mutating a cached
+    entry only marks the guild dirty; the owning Storage serializes and writes
+    dirty entries in its next batched flush.
+    """
+
+    def __init__(
+        self,
+        storage: 'Storage',
+        namespace: str,
+        default: Callable[[], Any],
+        load: Optional[Callable[[Any], Any]] = None,
+        dump: Optional[Callable[[Any], Any]] = None
+    ):
+        self.storage = storage
+        self.namespace = namespace
+        self._default = default
+        self._load = load or _identity
+        self._dump = dump or _identity
+        self._entries: Dict[int, Any] = {}
+        self._dirty: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    def get(self, guild_id: int) -> Optional[Any]:
+        """Return a guild's entry if it is already in memory"""
+        return self._entries.get(guild_id)
+
+    async def load(self, guild_id: int) -> Any:
+        """Return a guild's entry, reading it from storage on first access"""
+        entry = self._entries.get(guild_id)
+        if entry is None:
+            data = await self.storage.load(self.namespace, guild_id)
+            loaded = self._load(data) if data is not None else self._default()
+            # Another task may have loaded the guild while we awaited
+            entry = self._entries.setdefault(guild_id, loaded)
+        return entry
+
+    def mark_dirty(self, guild_id: int):
+        """Schedule a guild's entry for the next flush"""
+        if guild_id in self._entries:
+            self._dirty.add(guild_id)
+
+    def take_dirty(self) -> List[Tuple[str, int, str]]:
+        """Serialize and clear the dirty set, returning rows for the flush"""
+        dirty, self._dirty = self._dirty, set()
+        rows = []
+        for guild_id in dirty:
+            try:
+                data = json.dumps(self._dump(self._entries[guild_id]), ensure_ascii=False)
+            except Exception as e:
+                # One unserializable entry must not hold back every other guild's writes
+                logger.error(f'❌ Failed to serialize {self.namespace} state for {guild_id}: {e}')
+                continue
+            rows.append((self.namespace, guild_id, data))
+        return rows
+
+
+class Storage:
+    """Shared SQLite store for per-guild cog state.
+
+    One aiosqlite connection is opened for the whole bot and runs in WAL mode.
+    Cogs keep their state in ConfigCache instances; dirty entries from every
+    cache, together with buffered moderation ledger rows, are written in a
+    single transaction by a background task and once more when the store is
+    closed.
+    """
+
+    def __init__(self, path: str = 'bot.db', flush_interval: float = 5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._db: Optional[aiosqlite.Connection] = None
+        self._caches: Dict[str, ConfigCache] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.ledger = ModLedger(self)
+
+    async def open(self):
+        """Open the connection, apply pragmas and start the flush loop"""
+        self._db = await aiosqlite.connect(self.path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in (_SCHEMA, *LEDGER_SCHEMA):
+            await self._db.execute(statement)
+        await self._db.commit()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f'💾 Storage opened: {self.path}')
+
+    async def close(self):
+        """Flush outstanding writes and close the connection"""
+        if self._flush_task:
+            # Wait for the cancel to land, so an interrupted flush has put its batch back
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._db:
+            await self.flush()
+            await self._db.close()
+            self._db = None
+
+    def cache(
+        self,
+        namespace: str,
+        default: Callable[[], Any],
+        load: Optional[Callable[[Any], Any]] = None,
+        dump: Optional[Callable[[Any], Any]] = None
+    ) -> ConfigCache:
+        """Return the cache for a namespace, creating it on first use.
+
+        Reloading a cog gets the same cache back, so in-memory and dirty state
+        survive the reload.
+        """
+        cache = self._caches.get(namespace)
+        if cache is None:
+            cache = self._caches[namespace] = ConfigCache(self, namespace, default, load, dump)
+        return cache
+
+    async def load(self, namespace: str, guild_id: int) -> Optional[Any]:
+        """Read a guild's stored state for a namespace, or None if nothing is stored"""
+        async with self._db.execute(
+            "SELECT data FROM guild_state WHERE namespace = ? AND guild_id = ?",
+            (namespace, guild_id)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def fetch(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """Run a read-only query and return every row"""
+        async with self._db.execute(sql, params) as cursor:
+            return list(await cursor.fetchall())
+
+    async def flush(self):
+        """Write every dirty cache entry and pending ledger row in one transaction"""
+        async with self._lock:
+            if not self._db:
+                return
+            rows = [row for cache in self._caches.values() for row in cache.take_dirty()]
+            ledger_rows = self.ledger.take_pending()
+            if not rows and not ledger_rows:
+                return
+
+            commit = None
+            try:
+                if rows:
+                    await self._db.executemany(
+                        "INSERT INTO guild_state (namespace, guild_id, data) VALUES (?, ?, ?) "
+                        "ON CONFLICT(namespace, guild_id) DO UPDATE SET data = excluded.data",
+                        rows
+                    )
+                if ledger_rows:
+                    await self._db.executemany(LEDGER_INSERT, ledger_rows)
+                commit = asyncio.ensure_future(self._db.commit())
+                await asyncio.shield(commit)
+            except BaseException as e:
+                if commit is not None:
+                    # A cancel cannot stop a commit already on the connection thread;
+                    # if it went through, the batch is stored and must not be retried
+                    await asyncio.wait({commit})
+                    if not commit.cancelled() and commit.exception() is None:
+                        raise
+                # Re-mark the batch so the next flush retries it. Cancellation lands
+                # here too when close() stops the flush loop mid-write; the statement
+                # still runs on the connection thread, so it is rolled back either way.
+                for namespace, guild_id, _ in rows:
+                    self._caches[namespace].mark_dirty(guild_id)
+                self.ledger.requeue(ledger_rows)
+                await self._db.rollback()
+                if not isinstance(e, Exception):
+                    raise
+                logger.error(f'❌ Storage flush failed: {e}')
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                # Keep flushing periodically; the batch has already been put back
+                logger.error(f'❌ Storage flush loop error: {e}')
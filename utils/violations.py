@@ -0,0 +1,74 @@
+import time
+from array import array
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+ViolationKey = Tuple[int, int]  # (guild_id, user_id)
+
+
+class ViolationStore:
+    """Bounded, time-windowed violation history keyed by (guild, user).
+
+    Each offender keeps at most ``max_events`` timestamps in a flat float
+    array. Keys are ordered by their latest violation, so the least recently
+    seen offenders are evicted first once ``max_entries`` is reached, and
+    offenders idle for longer than ``ttl`` seconds are dropped.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_events: int = 32, ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.max_events = max_events
+        self.ttl = ttl
+        self._entries: 'OrderedDict[ViolationKey, array]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, guild_id: int, user_id: int, now: Optional[float] = None) -> int:
+        """Record a violation and return the offender's count within ``ttl``"""
+        now = time.time() if now is None else now
+        self._expire(now)
+
+        key = (guild_id, user_id)
+        events = self._entries.get(key)
+        if events is None:
+            events = self._entries[key] = array('d')
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        events.append(now)
+        if len(events) > self.max_events:
+            del events[0]
+        return self._count(events, now - self.ttl)
+
+    def count(self, guild_id: int, user_id: int, window: Optional[float] = None, now: Optional[float] = None) -> int:
+        """Number of violations in the last ``window`` seconds (defaults to ``ttl``)"""
+        events = self._entries.get((guild_id, user_id))
+        if not events:
+            return 0
+        now = time.time() if now is None else now
+        return self._count(events, now - (self.ttl if window is None else window))
+
+    def clear(self, guild_id: int, user_id: int):
+        self._entries.pop((guild_id, user_id), None)
+
+    def _expire(self, now: float):
+        # Keys are ordered by last violation, so only the front can be stale
+        cutoff = now - self.ttl
+        while self._entries:
+            key, events = next(iter(self._entries.items()))
+            if events[-1] >= cutoff:
+                break
+            del self._entries[key]
+
+    @staticmethod
+    def _count(events: array, cutoff: float) -> int:
+        # Timestamps are appended in order; scan back from the newest
+        count = 0
+        for stamp in reversed(events):
+            if stamp < cutoff:
+                break
+            count += 1
+        return count